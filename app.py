@@ -1,50 +1,429 @@
 # matrix_visualizer.py
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, render_template_string, request, jsonify, Response, g, has_request_context
+import click
 import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import bisect
+import gzip
+import hashlib
+import json
 import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from werkzeug.exceptions import HTTPException, NotFound
 
 app = Flask(__name__)
 
-def parse_matrix(matrix_data):
+def _parse_matrix_fast(matrix_data, rows, cols, dtype):
+    """Bulk conversion straight into an ndarray; None when a cell needs per-cell handling"""
+    try:
+        if all(type(row) is list and len(row) == cols for row in matrix_data):
+            matrix = np.array(matrix_data, dtype=dtype)
+        else:
+            # Ragged rows: copy each row (truncated to the first row's width) into a
+            # zero-filled array, which pads short rows exactly like the cell loop.
+            matrix = np.zeros((rows, cols), dtype=dtype)
+            for i, row in enumerate(matrix_data):
+                if type(row) is not list:
+                    return None
+                width = min(len(row), cols)
+                matrix[i, :width] = row[:width]
+    except (ValueError, TypeError):
+        return None
+    
+    if matrix.shape != (rows, cols):
+        return None
+    # NumPy turns None into NaN where float() would reject it; let the cell loop decide
+    if np.issubdtype(matrix.dtype, np.floating) and np.isnan(matrix).any():
+        return None
+    return matrix
+
+def _parse_matrix_cells(matrix_data, rows, cols, dtype):
+    """Per-cell conversion: invalid or missing cells become 0.0"""
+    matrix = np.zeros((rows, cols), dtype=dtype)
+    for i in range(rows):
+        for j in range(cols):
+            try:
+                matrix[i, j] = float(matrix_data[i][j])
+            except (ValueError, IndexError):
+                pass
+    return matrix
+
+def parse_matrix(matrix_data, dtype=np.float64):
     """Parse matrix from grid input"""
+    if isinstance(matrix_data, np.ndarray):  # Decoded from a binary request, no copy
+        if matrix_data.ndim != 2:
+            raise ValueError(f"Invalid matrix format: expected 2 dimensions, got {matrix_data.ndim}")
+        return matrix_data.astype(dtype, copy=False)
     try:
         rows = len(matrix_data)
         cols = len(matrix_data[0]) if rows > 0 else 0
+        if rows == 0:
+            return np.array([], dtype=dtype)
         
-        matrix = []
-        for i in range(rows):
-            row = []
-            for j in range(cols):
-                try:
-                    value = float(matrix_data[i][j])
-                    row.append(value)
-                except (ValueError, IndexError):
-                    row.append(0.0)
-            matrix.append(row)
-        return np.array(matrix)
+        matrix = _parse_matrix_fast(matrix_data, rows, cols, dtype)
+        if matrix is None:
+            matrix = _parse_matrix_cells(matrix_data, rows, cols, dtype)
+        return matrix
     except Exception as e:
         raise ValueError(f"Invalid matrix format: {str(e)}")
 
-def apply_convolution(matrix, kernel, stride=1, padding=0):
-    """Apply convolution operation"""
+def _nesting_depth(data):
+    """Depth of nested lists, following the first element at each level"""
+    depth = 0
+    while isinstance(data, list) and len(data) > 0:
+        data = data[0]
+        depth += 1
+    return depth
+
+def parse_tensor(tensor_data, dtype=np.float64):
+    """Parse a 2-D grid, a C×H×W / N×C×H×W input or a C_out×C_in×kh×kw filter bank"""
+    if isinstance(tensor_data, np.ndarray):
+        if not 2 <= tensor_data.ndim <= 4:
+            raise ValueError(f"Invalid tensor format: expected 2 to 4 dimensions, got {tensor_data.ndim}")
+        return tensor_data.astype(dtype, copy=False)
+    
+    depth = _nesting_depth(tensor_data)
+    if depth <= 2:
+        return parse_matrix(tensor_data, dtype)
+    if depth > 4:
+        raise ValueError(f"Invalid tensor format: expected 2 to 4 dimensions, got {depth}")
+    
+    try:
+        tensor = np.array(tensor_data, dtype=dtype)
+    except (ValueError, TypeError):
+        tensor = None
+    if (tensor is None or tensor.ndim != depth
+            or (np.issubdtype(tensor.dtype, np.floating) and np.isnan(tensor).any())):
+        # Parse slice by slice so every 2-D grid keeps parse_matrix's cell semantics
+        slices = [parse_tensor(item, dtype) for item in tensor_data]
+        if len({piece.shape for piece in slices}) != 1:
+            raise ValueError("Invalid tensor format: slices have different shapes")
+        tensor = np.stack(slices)
+    return tensor
+
+def _output_size(size, window, stride):
+    """Number of window positions along one axis"""
+    return max((size - window) // stride + 1, 0)
+
+def _dilated_size(size, dilation):
+    """Input span of `size` kernel taps spaced `dilation` cells apart"""
+    return (size - 1) * dilation + 1
+
+def _window_view(matrix, window_shape, stride=1, dilation=1):
+    """Strided (read-only) view of every window: shape (out_h, out_w, kh, kw)
+
+    With dilation > 1 each window is the dilated span subsampled every `dilation`
+    cells, still a view: the kernel is never inflated with zeros.
+    """
+    kh, kw = window_shape
+    span_h, span_w = _dilated_size(kh, dilation), _dilated_size(kw, dilation)
+    out_h = _output_size(matrix.shape[0], span_h, stride)
+    out_w = _output_size(matrix.shape[1], span_w, stride)
+    if out_h == 0 or out_w == 0:
+        return np.zeros((out_h, out_w, kh, kw), dtype=matrix.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(matrix, (span_h, span_w))
+    return windows[::stride, ::stride, ::dilation, ::dilation][:out_h, :out_w]
+
+def apply_convolution_reference(matrix, kernel, stride=1, padding=0, dilation=1):
+    """Apply convolution operation (reference per-cell loop, used for equivalence checks)"""
     if padding > 0:
         matrix = np.pad(matrix, padding, mode='constant')
     
-    output_height = (matrix.shape[0] - kernel.shape[0]) // stride + 1
-    output_width = (matrix.shape[1] - kernel.shape[1]) // stride + 1
+    span_h = _dilated_size(kernel.shape[0], dilation)
+    span_w = _dilated_size(kernel.shape[1], dilation)
+    output_height = (matrix.shape[0] - span_h) // stride + 1
+    output_width = (matrix.shape[1] - span_w) // stride + 1
     
     result = np.zeros((output_height, output_width))
     
     for i in range(0, output_height):
         for j in range(0, output_width):
-            region = matrix[i*stride:i*stride+kernel.shape[0], 
-                           j*stride:j*stride+kernel.shape[1]]
+            region = matrix[i*stride:i*stride+span_h:dilation, 
+                           j*stride:j*stride+span_w:dilation]
             result[i, j] = np.sum(region * kernel)
     
     return result
 
-def apply_pooling(matrix, pool_size=2, stride=2, mode='max'):
-    """Apply pooling operation"""
+# Algorithm selection: kernels with at most DIRECT_MAX_TAPS cells are cheapest as a
+# shift-and-add over the taps; larger ones go through im2col unless the estimated
+# FFT cost (FFT_COST_FACTOR * n log2 n over the transform size) is lower. Kernels
+# of rank <= SEPARABLE_MAX_RANK (singular values below SEPARABLE_TOLERANCE relative
+# to the largest are treated as zero) can run as sums of two 1-D passes. Dilated
+# kernels read their taps through strided views, so every algorithm except FFT
+# (which would need a zero-inflated kernel) supports dilation at no extra cost.
+CONV_ALGORITHMS = ('direct', 'im2col', 'fft', 'separable')
+DIRECT_MAX_TAPS = 9
+FFT_COST_FACTOR = 4.0
+SEPARABLE_TOLERANCE = 1e-10
+SEPARABLE_MAX_RANK = 2
+# FFT results match the direct path to within
+# FFT_TOLERANCE * max|matrix| * sum|kernel| (absolute) for float64 inputs.
+FFT_TOLERANCE = 1e-10
+
+def _next_fast_len(n):
+    """Smallest 5-smooth size >= n (fast sizes for the FFT)"""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+def kernel_decomposition(kernel, tol=SEPARABLE_TOLERANCE, max_rank=SEPARABLE_MAX_RANK):
+    """Split a kernel into (column, row) outer-product factors, or None if not low rank"""
+    kh, kw = kernel.shape
+    if kh == 1 or kw == 1 or not np.any(kernel):
+        return None
+    
+    u, sigma, vt = np.linalg.svd(kernel)
+    rank = int(np.sum(sigma > tol * sigma[0]))
+    if rank > max_rank:
+        return None
+    
+    if rank == 1:
+        # Factor through the largest entry so integer kernels (box, Sobel, ...)
+        # keep exact integer factors instead of normalized singular vectors.
+        i, j = np.unravel_index(np.argmax(np.abs(kernel)), kernel.shape)
+        return [(kernel[:, j].copy(), kernel[i, :] / kernel[i, j])]
+    return [(u[:, r] * sigma[r], vt[r].copy()) for r in range(rank)]
+
+def select_conv_algorithm(input_shape, kernel_shape, stride=1, separable_rank=None, dilation=1):
+    """Pick 'direct', 'im2col', 'fft' or 'separable' for an already padded input"""
+    kh, kw = kernel_shape
+    out_h = _output_size(input_shape[0], _dilated_size(kh, dilation), stride)
+    out_w = _output_size(input_shape[1], _dilated_size(kw, dilation), stride)
+    if out_h == 0 or out_w == 0:
+        return 'direct'
+    
+    taps = kh * kw
+    costs = {'direct' if taps <= DIRECT_MAX_TAPS else 'im2col': out_h * out_w * taps}
+    if dilation == 1:
+        fft_cells = _next_fast_len(input_shape[0]) * _next_fast_len(input_shape[1])
+        costs['fft'] = FFT_COST_FACTOR * fft_cells * np.log2(fft_cells)
+    if separable_rank:
+        # Row pass over every input row the output touches, then the column pass
+        input_rows = (out_h - 1) * stride + _dilated_size(kh, dilation)
+        costs['separable'] = separable_rank * out_w * (input_rows * kw + out_h * kh)
+    return min(costs, key=costs.get)
+
+def plan_convolution(input_shape, kernel, stride=1, algorithm='auto', dilation=1):
+    """Resolve the algorithm for a padded input; returns (algorithm, separable factors)"""
+    if algorithm not in CONV_ALGORITHMS and algorithm != 'auto':
+        raise ValueError(f"Unknown convolution algorithm: {algorithm}")
+    if dilation < 1:
+        raise ValueError(f"Dilation must be at least 1, got {dilation}")
+    if algorithm == 'fft' and dilation > 1:
+        raise ValueError("The fft algorithm does not support dilation")
+    if len(input_shape) > 2 or kernel.ndim > 2:
+        # Multi-channel layers always run as one batched im2col GEMM
+        if algorithm not in ('auto', 'im2col'):
+            raise ValueError(f"Multi-channel convolution only supports im2col, not {algorithm}")
+        return 'im2col', None
+    if np.issubdtype(kernel.dtype, np.integer):
+        # Integer (int8 quantized) kernels stay in integer arithmetic: no FFT, no float factors
+        if algorithm in ('fft', 'separable'):
+            raise ValueError(f"Integer kernels do not support the {algorithm} algorithm")
+        if algorithm == 'auto':
+            algorithm = 'direct' if kernel.size <= DIRECT_MAX_TAPS else 'im2col'
+        return algorithm, None
+    
+    factors = None
+    if algorithm in ('auto', 'separable'):
+        factors = cached_kernel_decomposition(kernel)
+    if algorithm == 'separable' and factors is None:
+        raise ValueError("Kernel is not separable")
+    if algorithm == 'auto':
+        rank = len(factors) if factors else None
+        algorithm = select_conv_algorithm(input_shape, kernel.shape, stride, rank, dilation)
+    return algorithm, (factors if algorithm == 'separable' else None)
+
+def _convolve_direct(matrix, kernel, stride, dilation=1):
+    """Shift-and-add over kernel taps: one vectorized multiply-add per tap"""
+    kh, kw = kernel.shape
+    out_h = _output_size(matrix.shape[0], _dilated_size(kh, dilation), stride)
+    out_w = _output_size(matrix.shape[1], _dilated_size(kw, dilation), stride)
+    result = np.zeros((out_h, out_w), dtype=np.result_type(matrix, kernel))
+    if out_h == 0 or out_w == 0:
+        return result
+    
+    scratch = np.empty_like(result)
+    row_span = (out_h - 1) * stride + 1
+    col_span = (out_w - 1) * stride + 1
+    for di in range(kh):
+        for dj in range(kw):
+            weight = kernel[di, dj]
+            if weight == 0:
+                continue
+            top, left = di * dilation, dj * dilation
+            region = matrix[top:top + row_span:stride, left:left + col_span:stride]
+            np.multiply(region, weight, out=scratch)
+            result += scratch
+    return result
+
+def _convolve_im2col(matrix, kernel, stride, dilation=1):
+    """im2col: strided windows contracted with the kernel in one tensordot"""
+    windows = _window_view(matrix, kernel.shape, stride, dilation)
+    return np.tensordot(windows, kernel, axes=((2, 3), (0, 1)))
+
+def _convolve_fft(matrix, kernel, stride):
+    """FFT correlation; stride is applied by subsampling the valid result"""
+    kh, kw = kernel.shape
+    height, width = matrix.shape
+    if height < kh or width < kw:
+        return _convolve_direct(matrix, kernel, stride)
+    
+    # A transform at least as large as the input keeps circular wrap-around out
+    # of the valid region, so no extra zero padding is needed.
+    shape = (_next_fast_len(height), _next_fast_len(width))
+    spectrum = np.fft.rfft2(matrix, shape) * kernel_spectrum(kernel, shape)
+    full = np.fft.irfft2(spectrum, shape)
+    return full[kh - 1:height, kw - 1:width][::stride, ::stride]
+
+def _convolve_separable(matrix, factors, stride, dilation=1):
+    """Sum of separable passes: a 1-D row pass then a 1-D column pass per factor"""
+    kh, kw = len(factors[0][0]), len(factors[0][1])
+    out_h = _output_size(matrix.shape[0], _dilated_size(kh, dilation), stride)
+    out_w = _output_size(matrix.shape[1], _dilated_size(kw, dilation), stride)
+    dtype = np.result_type(matrix, *[f for pair in factors for f in pair])
+    result = np.zeros((out_h, out_w), dtype=dtype)
+    if out_h == 0 or out_w == 0:
+        return result
+    
+    row_span = (out_h - 1) * stride + 1
+    col_span = (out_w - 1) * stride + 1
+    rows = matrix[:row_span + (kh - 1) * dilation]
+    horizontal = np.empty((rows.shape[0], out_w), dtype=dtype)
+    row_scratch = np.empty_like(horizontal)
+    scratch = np.empty_like(result)
+    for column, row in factors:
+        horizontal.fill(0)
+        for dj, weight in enumerate(row):
+            if weight == 0:
+                continue
+            left = dj * dilation
+            np.multiply(rows[:, left:left + col_span:stride], weight, out=row_scratch)
+            horizontal += row_scratch
+        for di, weight in enumerate(column):
+            if weight == 0:
+                continue
+            top = di * dilation
+            np.multiply(horizontal[top:top + row_span:stride], weight, out=scratch)
+            result += scratch
+    return result
+
+_CONV_BACKENDS = {
+    'direct': _convolve_direct,
+    'im2col': _convolve_im2col,
+}
+
+def _convolve_layer(inputs, weights, stride, dilation=1, groups=1):
+    """Batched im2col: every (image, output cell) window against every filter in one GEMM
+
+    With groups > 1 the filters are C_out×(C_in/groups)×kh×kw and each group of
+    C_out/groups filters sees only its slice of the input channels: one GEMM per group.
+    """
+    x = inputs.reshape((1,) * (4 - inputs.ndim) + inputs.shape)
+    w = weights.reshape((1,) * (4 - weights.ndim) + weights.shape)
+    if x.shape[1] != w.shape[1] * groups:
+        raise ValueError(f"Kernel expects {w.shape[1] * groups} input channels, got {x.shape[1]}")
+    if w.shape[0] % groups:
+        raise ValueError(f"{w.shape[0]} filters do not split into {groups} groups")
+    
+    kh, kw = w.shape[2:]
+    span_h, span_w = _dilated_size(kh, dilation), _dilated_size(kw, dilation)
+    out_h = _output_size(x.shape[2], span_h, stride)
+    out_w = _output_size(x.shape[3], span_w, stride)
+    if out_h == 0 or out_w == 0:
+        return np.zeros((x.shape[0], w.shape[0], out_h, out_w), dtype=np.result_type(x, w))
+    
+    windows = np.lib.stride_tricks.sliding_window_view(x, (span_h, span_w), axis=(2, 3))
+    windows = windows[:, :, ::stride, ::stride, ::dilation, ::dilation][:, :, :out_h, :out_w]
+    if groups == 1:
+        # (N, C_in, out_h, out_w, kh, kw) x (C_out, C_in, kh, kw) -> (N, out_h, out_w, C_out)
+        result = np.tensordot(windows, w, axes=((1, 4, 5), (1, 2, 3)))
+        return result.transpose(0, 3, 1, 2)
+    
+    n, group_channels = x.shape[0], w.shape[1]
+    # (G, N·out_h·out_w, C_in/G·kh·kw) @ (G, C_in/G·kh·kw, C_out/G) -> (G, N·out_h·out_w, C_out/G)
+    columns = windows.reshape(n, groups, group_channels, out_h, out_w, kh, kw)
+    columns = columns.transpose(1, 0, 3, 4, 2, 5, 6).reshape(groups, n * out_h * out_w, -1)
+    filters = w.reshape(groups, w.shape[0] // groups, -1).transpose(0, 2, 1)
+    result = np.matmul(columns, filters).reshape(groups, n, out_h, out_w, -1)
+    return result.transpose(1, 0, 4, 2, 3).reshape(n, w.shape[0], out_h, out_w)
+
+def _pad_spatial(matrix, padding):
+    """Zero-pad the last two axes"""
+    return np.pad(matrix, [(0, 0)] * (matrix.ndim - 2) + [(padding, padding)] * 2, mode='constant')
+
+def _as_bias(bias, out_channels, dtype=np.float64):
+    """Per-filter bias vector in the result dtype (a single value applies to every filter)"""
+    bias = np.asarray(bias, dtype=np.float64).reshape(-1)
+    if bias.size == 1:
+        bias = np.repeat(bias, out_channels)
+    if bias.size != out_channels:
+        raise ValueError(f"Bias needs {out_channels} values, got {bias.size}")
+    if np.issubdtype(dtype, np.integer):
+        bias = np.rint(bias)
+    return bias.astype(dtype, copy=False)
+
+def _accumulator_operands(matrix, kernel):
+    """Integer operands are widened to (at least) int32 so int8 products accumulate exactly"""
+    if np.issubdtype(matrix.dtype, np.integer) and np.issubdtype(kernel.dtype, np.integer):
+        dtype = np.promote_types(np.result_type(matrix, kernel), np.int32)
+        return matrix.astype(dtype, copy=False), kernel.astype(dtype, copy=False)
+    return matrix, kernel
+
+def apply_convolution(matrix, kernel, stride=1, padding=0, algorithm='auto', bias=None, dilation=1,
+                      groups=1):
+    """Apply convolution operation with the given (or automatically selected) algorithm
+
+    Besides 2-D matrices this accepts C×H×W or N×C×H×W inputs and C_in×kh×kw or
+    C_out×C_in×kh×kw filter banks, returning C_out×H'×W' (N×C_out×H'×W' for batches).
+    The result keeps the operands' float dtype; integer operands accumulate in int32.
+    `dilation` spaces the kernel taps apart (atrous convolution); `groups` splits the
+    channels of multi-channel inputs into independent groups (groups == C_in is depthwise).
+    """
+    if groups < 1:
+        raise ValueError(f"Groups must be at least 1, got {groups}")
+    matrix, kernel = _accumulator_operands(matrix, kernel)
+    if padding > 0:
+        with timed('pad'):
+            matrix = _pad_spatial(matrix, padding)
+    
+    algorithm, factors = plan_convolution(matrix.shape, kernel, stride, algorithm, dilation)
+    if matrix.ndim > 2 or kernel.ndim > 2:
+        result = _convolve_layer(matrix, kernel, stride, dilation, groups)
+        if bias is not None:
+            result = result + _as_bias(bias, result.shape[1], result.dtype)[:, None, None]
+        result = np.ascontiguousarray(result)
+        if matrix.ndim == 4:
+            return result
+        return result[0] if matrix.ndim == 3 or kernel.ndim == 4 else result[0, 0]
+    
+    if groups != 1:
+        raise ValueError("Grouped convolution needs a multi-channel input or kernel")
+    if algorithm == 'separable':
+        result = _convolve_separable(matrix, factors, stride, dilation)
+    elif algorithm == 'fft':
+        result = _convolve_fft(matrix, kernel, stride)
+    else:
+        result = _CONV_BACKENDS[algorithm](matrix, kernel, stride, dilation)
+    if bias is not None:
+        result = result + _as_bias(bias, 1, result.dtype)[0]
+    return result
+
+def apply_pooling_reference(matrix, pool_size=2, stride=2, mode='max'):
+    """Apply pooling operation (reference per-window loop, used for equivalence checks)"""
     if pool_size == 0:  # Pooling disabled
         return matrix
         
@@ -67,6 +446,1184 @@ def apply_pooling(matrix, pool_size=2, stride=2, mode='max'):
     
     return result
 
+# Pooling methods: 'window' reduces strided window views directly; overlapping
+# windows of at least POOL_STREAMING_MIN_SIZE switch to methods whose cost does not
+# grow with the pool size: a summed-area table for avg (only when every partial sum
+# is exact, so results stay bit-identical) and van Herk/Gil-Werman running extrema
+# for max/min.
+POOL_MODES = ('max', 'avg', 'min')
+POOL_METHODS = ('window', 'sat', 'vhgw')
+POOL_STREAMING_MIN_SIZE = 4
+POOL_CHUNK_CELLS = 1 << 20
+
+def _pool_output_shape(shape, pool_size, stride):
+    """Pooled shape over the last two axes"""
+    return (tuple(shape[:-2]) + (_output_size(shape[-2], pool_size, stride),
+                                 _output_size(shape[-1], pool_size, stride)))
+
+def _pool_dtype(dtype, mode):
+    """Result dtype: max/min keep the input dtype, averages stay float (float64 for integers)"""
+    if mode != 'avg' or np.issubdtype(dtype, np.floating):
+        return dtype
+    return np.dtype(np.float64)
+
+def _has_exact_sums(matrix):
+    """True when float64 prefix sums of the matrix are exact (integer cells, bounded total)"""
+    if not np.issubdtype(matrix.dtype, np.number):
+        return False
+    with np.errstate(invalid='ignore'):
+        if not np.all(np.mod(matrix, 1) == 0):
+            return False
+    return float(np.abs(matrix).sum()) < 2.0 ** 53
+
+def select_pool_method(pool_size, stride, mode):
+    """Pick 'window', 'sat' or 'vhgw' from the window size and stride"""
+    if stride >= pool_size or pool_size < POOL_STREAMING_MIN_SIZE:
+        return 'window'
+    return 'sat' if mode == 'avg' else 'vhgw'
+
+def plan_pooling(matrix, pool_size, stride, mode, method='auto'):
+    """Resolve the pooling method, falling back to 'window' where 'sat' would round"""
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown pooling mode: {mode}")
+    if method == 'auto':
+        method = select_pool_method(pool_size, stride, mode)
+    if method not in POOL_METHODS:
+        raise ValueError(f"Unknown pooling method: {method}")
+    if method == 'sat' and (mode != 'avg' or not _has_exact_sums(matrix)):
+        method = 'window'
+    if method == 'vhgw' and mode == 'avg':
+        method = 'window'
+    return method
+
+def _pool_window(matrix, pool_size, stride, mode):
+    """Reduce strided window views; avg gathers windows in bounded row chunks"""
+    windows = np.lib.stride_tricks.sliding_window_view(
+        matrix, (pool_size, pool_size), axis=(-2, -1))[..., ::stride, ::stride, :, :]
+    if mode == 'max':
+        return windows.max(axis=(-2, -1))
+    if mode == 'min':
+        return windows.min(axis=(-2, -1))
+    
+    # np.mean over a contiguous copy of each window sums in the same order as
+    # np.mean(region) does, which keeps averages bit-identical to the reference.
+    result = np.empty(windows.shape[:-2], dtype=_pool_dtype(matrix.dtype, mode))
+    row_cells = max(windows[..., :1, :, :, :].size, 1)
+    rows_per_chunk = max(POOL_CHUNK_CELLS // row_cells, 1)
+    window_cells = pool_size * pool_size
+    for start in range(0, windows.shape[-4], rows_per_chunk):
+        chunk = windows[..., start:start + rows_per_chunk, :, :, :]
+        result[..., start:start + rows_per_chunk, :] = (
+            chunk.reshape(chunk.shape[:-2] + (window_cells,)).mean(axis=-1))
+    return result
+
+def _pool_sat(matrix, pool_size, stride):
+    """Average pooling from a summed-area table: four lookups per window"""
+    height, width = matrix.shape[-2:]
+    table = np.zeros(matrix.shape[:-2] + (height + 1, width + 1))
+    np.cumsum(matrix, axis=-2, out=table[..., 1:, 1:])
+    np.cumsum(table[..., 1:, 1:], axis=-1, out=table[..., 1:, 1:])
+    
+    out_h = _output_size(height, pool_size, stride)
+    out_w = _output_size(width, pool_size, stride)
+    row_end = (out_h - 1) * stride + 1
+    col_end = (out_w - 1) * stride + 1
+    top = table[..., 0:row_end:stride, :]
+    bottom = table[..., pool_size:pool_size + row_end:stride, :]
+    sums = (bottom[..., pool_size:pool_size + col_end:stride] - bottom[..., 0:col_end:stride]
+            - top[..., pool_size:pool_size + col_end:stride] + top[..., 0:col_end:stride])
+    return (sums / (pool_size * pool_size)).astype(_pool_dtype(matrix.dtype, 'avg'), copy=False)
+
+def _running_extreme(matrix, size, stride, mode):
+    """van Herk/Gil-Werman running max/min along the last axis, subsampled by stride"""
+    op = np.maximum if mode == 'max' else np.minimum
+    if np.issubdtype(matrix.dtype, np.integer):
+        info = np.iinfo(matrix.dtype)
+        fill = info.min if mode == 'max' else info.max
+    else:
+        fill = -np.inf if mode == 'max' else np.inf
+    
+    length = matrix.shape[-1]
+    count = length - size + 1
+    blocks = -(-length // size)
+    padded = np.full(matrix.shape[:-1] + (blocks * size,), fill, dtype=matrix.dtype)
+    padded[..., :length] = matrix
+    padded = padded.reshape(matrix.shape[:-1] + (blocks, size))
+    
+    # prefix[i]: extreme from the start of i's block up to i; suffix[i]: from i to
+    # the end of its block. Any window of `size` cells is covered by exactly one
+    # suffix and one prefix.
+    prefix = op.accumulate(padded, axis=-1).reshape(matrix.shape[:-1] + (blocks * size,))
+    suffix = op.accumulate(padded[..., ::-1], axis=-1)[..., ::-1]
+    suffix = suffix.reshape(matrix.shape[:-1] + (blocks * size,))
+    return op(suffix[..., 0:count:stride], prefix[..., size - 1:size - 1 + count:stride])
+
+def _pool_vhgw(matrix, pool_size, stride, mode):
+    """Separable max/min pooling: running extrema along rows, then along columns"""
+    out_h = _output_size(matrix.shape[-2], pool_size, stride)
+    rows = matrix[..., :(out_h - 1) * stride + pool_size, :]
+    horizontal = _running_extreme(rows, pool_size, stride, mode)
+    vertical = _running_extreme(np.swapaxes(horizontal, -1, -2), pool_size, stride, mode)
+    return np.ascontiguousarray(np.swapaxes(vertical, -1, -2))
+
+def apply_pooling(matrix, pool_size=2, stride=2, mode='max', method='auto'):
+    """Apply pooling operation over the last two axes"""
+    if pool_size == 0:  # Pooling disabled
+        return matrix
+    
+    method = plan_pooling(matrix, pool_size, stride, mode, method)
+    output_shape = _pool_output_shape(matrix.shape, pool_size, stride)
+    if 0 in output_shape[-2:]:
+        return np.zeros(output_shape, dtype=_pool_dtype(matrix.dtype, mode))
+    
+    if method == 'sat':
+        return _pool_sat(matrix, pool_size, stride)
+    if method == 'vhgw':
+        return _pool_vhgw(matrix, pool_size, stride, mode)
+    return _pool_window(matrix, pool_size, stride, mode)
+
+# Reduced precision: requests pick a compute dtype from DTYPES. float32 halves the
+# memory traffic of float64 end to end (parsing, kernels, pooling, binary responses).
+# int8 quantizes the input symmetrically per tensor (scale = max|x| / 127, or 1 when
+# the input is already integer in range), needs an integer kernel in [-128, 127],
+# accumulates the convolution in int32 and dequantizes the result to float32.
+DTYPES = ('float64', 'float32', 'int8')
+QUANTIZED_MAX = 127
+
+def parse_dtype(dtype):
+    """NumPy dtype that request arrays are parsed into for a DTYPES name"""
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype: {dtype}")
+    return np.float32 if dtype == 'float32' else np.float64
+
+def quantize(matrix):
+    """Symmetric int8 quantization of a float tensor; returns (values, scale)"""
+    peak = float(np.abs(matrix).max()) if matrix.size else 0.0
+    if peak <= QUANTIZED_MAX and np.all(np.mod(matrix, 1) == 0):
+        scale = 1.0
+    else:
+        scale = peak / QUANTIZED_MAX
+    values = np.clip(np.rint(matrix / scale), -QUANTIZED_MAX, QUANTIZED_MAX).astype(np.int8)
+    return values, scale
+
+def quantize_kernel(kernel):
+    """int8 copy of an integer-valued kernel"""
+    if not np.all(np.mod(kernel, 1) == 0) or kernel.min() < -128 or kernel.max() > 127:
+        raise ValueError("int8 mode needs an integer kernel with values in [-128, 127]")
+    return kernel.astype(np.int8)
+
+def dequantize(values, scale):
+    """float32 values of an int8 tensor or int32 accumulator"""
+    return values.astype(np.float32) * np.float32(scale)
+
+# Layer pipelines: conv, pool and pad layers each start a stage; the elementwise
+# layers after them (activation, bias) run in place on that stage's freshly
+# allocated output, so they add no full-size temporaries. A fusion boundary is
+# only kept where the client asked for the intermediate result.
+PIPELINE_LAYERS = ('conv', 'pool', 'pad', 'relu', 'activation', 'bias')
+ELEMENTWISE_LAYERS = ('relu', 'activation', 'bias')
+ACTIVATIONS = ('relu', 'leaky_relu', 'sigmoid', 'tanh')
+
+def _elementwise_op(layer):
+    """In-place elementwise function for a relu/activation/bias layer"""
+    kind = layer['type']
+    if kind == 'bias':
+        value = np.asarray(layer.get('value', 0), dtype=np.float64)
+        
+        def add_bias(out):
+            # A vector of per-channel values broadcasts over the spatial axes
+            out += value.reshape(value.shape + (1, 1)) if value.ndim == 1 and value.size > 1 else value
+        return add_bias
+    
+    function = 'relu' if kind == 'relu' else layer.get('function', 'relu')
+    if function not in ACTIVATIONS:
+        raise ValueError(f"Unknown activation: {function}")
+    if function == 'relu':
+        return lambda out: np.maximum(out, 0, out=out)
+    if function == 'leaky_relu':
+        alpha = float(layer.get('alpha', 0.01))
+        return lambda out: np.multiply(out, alpha, out=out, where=out < 0)
+    if function == 'tanh':
+        return lambda out: np.tanh(out, out=out)
+    
+    def sigmoid(out):
+        with np.errstate(over='ignore'):
+            np.negative(out, out=out)
+            np.exp(out, out=out)
+            out += 1
+            np.reciprocal(out, out=out)
+    return sigmoid
+
+def _parse_layer(layer, dtype=np.float64):
+    """Validate one pipeline layer and parse its arrays and parameters"""
+    kind = layer.get('type')
+    if kind not in PIPELINE_LAYERS:
+        raise ValueError(f"Unknown layer type: {kind}")
+    if kind == 'conv':
+        if not _has_cells(layer.get('kernel')):
+            raise ValueError("Convolution layer needs a kernel")
+        bias = layer.get('bias')
+        return {
+            'type': kind,
+            'kernel': parse_tensor(layer['kernel'], dtype),
+            'bias': None if bias is None else np.asarray(bias, dtype=np.float64),
+            'stride': int(layer.get('stride', 1)),
+            'padding': int(layer.get('padding', 0)),
+            'dilation': int(layer.get('dilation', 1)),
+            'groups': int(layer.get('groups', 1)),
+            'algorithm': layer.get('algorithm', 'auto'),
+        }
+    if kind == 'pool':
+        size = int(layer.get('size', 2))
+        if size <= 0:
+            raise ValueError("Pooling layer needs a positive size")
+        return {
+            'type': kind,
+            'size': size,
+            'stride': int(layer.get('stride', size)),
+            'mode': layer.get('mode', 'max'),
+            'method': layer.get('method', 'auto'),
+        }
+    if kind == 'pad':
+        return {'type': kind, 'padding': int(layer.get('padding', 1)), 'value': float(layer.get('value', 0))}
+    return {'type': kind, 'apply': _elementwise_op(layer)}
+
+def compile_pipeline(layers, returned=(), dtype=np.float64):
+    """Compile layers into stages, fusing elementwise layers and zero-padding into neighbours"""
+    returned = set(returned)
+    stages = []
+    for index, raw in enumerate(layers):
+        layer = _parse_layer(raw, dtype)
+        previous = stages[-1] if stages else None
+        open_stage = previous is not None and previous['layers'][-1] not in returned
+        
+        if layer['type'] in ELEMENTWISE_LAYERS and open_stage:
+            previous['epilogue'].append(layer['apply'])
+            previous['fused'].append(raw.get('function', layer['type']))
+            previous['layers'].append(index)
+            continue
+        if (layer['type'] == 'conv' and open_stage and previous['op'] == 'pad'
+                and previous['layer']['value'] == 0 and not previous['epilogue']):
+            # Zero padding folds into the convolution's own padding
+            layer['padding'] += previous['layer']['padding']
+            stages[-1] = {'op': 'conv', 'layer': layer, 'epilogue': [], 'fused': ['pad'],
+                          'layers': previous['layers'] + [index]}
+            continue
+        
+        stage = {'op': layer['type'], 'layer': layer, 'epilogue': [], 'fused': [], 'layers': [index]}
+        if layer['type'] in ELEMENTWISE_LAYERS:
+            # Nothing to fuse into: copy the input once, then apply in place
+            stage['op'] = 'elementwise'
+            stage['epilogue'].append(layer['apply'])
+            stage['fused'].append(raw.get('function', layer['type']))
+        stages.append(stage)
+    return stages
+
+def run_pipeline(stages, matrix, returned=()):
+    """Execute compiled stages; returns (output, {layer index: result} for returned layers)"""
+    returned = set(returned)
+    outputs = {}
+    current = matrix
+    for stage in stages:
+        layer = stage['layer']
+        if stage['op'] == 'conv':
+            with timed('convolution'):
+                current = apply_convolution(current, layer['kernel'], layer['stride'], layer['padding'],
+                                            layer['algorithm'], layer['bias'], layer['dilation'],
+                                            layer['groups'])
+        elif stage['op'] == 'pool':
+            with timed('pooling'):
+                current = apply_pooling(current, layer['size'], layer['stride'], layer['mode'],
+                                        layer['method'])
+        elif stage['op'] == 'pad':
+            with timed('pad'):
+                widths = [(0, 0)] * (current.ndim - 2) + [(layer['padding'], layer['padding'])] * 2
+                current = np.pad(current, widths, mode='constant', constant_values=layer['value'])
+        else:
+            dtype = current.dtype if np.issubdtype(current.dtype, np.floating) else np.float64
+            current = np.array(current, dtype=dtype)
+        
+        if stage['epilogue']:
+            with timed('elementwise'):
+                for apply in stage['epilogue']:
+                    apply(current)
+        if stage['layers'][-1] in returned:
+            outputs[stage['layers'][-1]] = current
+    return current, outputs
+
+# Tiled execution for rasters larger than RAM: inputs and outputs are memory-mapped
+# (.npy, or raw buffers given shape and dtype) and processed in bands of output
+# rows. Each band reads its input rows plus the kernel/pool halo; zero padding is
+# added to that band only, never to the whole raster. TILE_BYTES bounds the input
+# band held in memory at once.
+TILE_BYTES = int(os.environ.get('TILE_BYTES', 32 * 1024 * 1024))
+
+def open_raster(path, shape=None, dtype='<f8', mode='r'):
+    """Memory-map a .npy file, or a raw file of the given shape and dtype"""
+    if str(path).endswith('.npy'):
+        return np.load(path, mmap_mode=mode)
+    if shape is None:
+        raise ValueError("Raw rasters need a shape")
+    return np.memmap(path, dtype=dtype, mode=mode, shape=tuple(shape))
+
+def create_raster(path, shape, dtype=np.float64):
+    """Create a writable memory-mapped output (.npy, or raw for any other extension)"""
+    if str(path).endswith('.npy'):
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+    return np.memmap(path, dtype=dtype, mode='w+', shape=tuple(shape))
+
+def _tile_rows(width, stride, tile_rows=None):
+    """Output rows per band so the band's input stays within TILE_BYTES"""
+    if tile_rows:
+        return tile_rows
+    return max(TILE_BYTES // (max(stride, 1) * max(width, 1) * 8), 1)
+
+def _read_band(matrix, row_start, row_stop, padding):
+    """Rows [row_start, row_stop) of the virtually zero-padded matrix"""
+    height, width = matrix.shape
+    band = np.zeros((row_stop - row_start, width + 2 * padding), dtype=matrix.dtype)
+    source_start = max(row_start - padding, 0)
+    source_stop = min(row_stop - padding, height)
+    if source_stop > source_start:
+        offset = source_start - (row_start - padding)
+        band[offset:offset + source_stop - source_start, padding:padding + width] = (
+            matrix[source_start:source_stop])
+    return band
+
+def _compute_band(op, matrix, params, row_start, row_stop):
+    """Output rows [row_start, row_stop) of a convolution or pooling, from its input halo"""
+    if op == 'conv':
+        kernel, stride, padding, algorithm = params
+        band = _read_band(matrix, row_start * stride, (row_stop - 1) * stride + kernel.shape[0], padding)
+        return apply_convolution(band, kernel, stride, 0, algorithm)
+    pool_size, stride, mode = params
+    band = np.asarray(matrix[row_start * stride:(row_stop - 1) * stride + pool_size])
+    return apply_pooling(band, pool_size, stride, mode)
+
+def convolve_tiled(matrix, kernel, out, stride=1, padding=0, algorithm='auto', tile_rows=None,
+                   workers=1):
+    """apply_convolution over a (memory-mapped) matrix, written band by band into `out`"""
+    kh, kw = kernel.shape
+    height, width = matrix.shape
+    out_h = _output_size(height + 2 * padding, kh, stride)
+    out_w = _output_size(width + 2 * padding, kw, stride)
+    if out.shape != (out_h, out_w):
+        raise ValueError(f"Output must have shape {(out_h, out_w)}, got {out.shape}")
+    
+    rows = _tile_rows(width + 2 * padding, stride, tile_rows)
+    band_shape = ((min(rows, out_h) - 1) * stride + kh, width + 2 * padding)
+    algorithm, _ = plan_convolution(band_shape, kernel, stride, algorithm)
+    params = (kernel, stride, padding, algorithm)
+    _run_bands(out_h, rows, workers,
+               lambda start, stop: out.__setitem__(slice(start, stop),
+                                                   _compute_band('conv', matrix, params, start, stop)))
+    return out
+
+def pool_tiled(matrix, out, pool_size=2, stride=2, mode='max', tile_rows=None, workers=1):
+    """apply_pooling over a (memory-mapped) matrix, written band by band into `out`"""
+    height, width = matrix.shape
+    out_h = _output_size(height, pool_size, stride)
+    out_w = _output_size(width, pool_size, stride)
+    if out.shape != (out_h, out_w):
+        raise ValueError(f"Output must have shape {(out_h, out_w)}, got {out.shape}")
+    
+    rows = _tile_rows(width, stride, tile_rows)
+    params = (pool_size, stride, mode)
+    _run_bands(out_h, rows, workers,
+               lambda start, stop: out.__setitem__(slice(start, stop),
+                                                   _compute_band('pool', matrix, params, start, stop)))
+    return out
+
+def process_file(input_path, output_path, kernel=None, stride=1, padding=0, pool_size=0,
+                 pool_stride=2, pool_mode='max', shape=None, dtype='<f8', tile_rows=None,
+                 workers=1):
+    """Tiled convolution and/or pooling from a raster file into a memory-mapped result file"""
+    matrix = open_raster(input_path, shape, dtype)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2-D raster, got {matrix.ndim} dimensions")
+    
+    intermediate = None
+    current = matrix
+    try:
+        if kernel is not None:
+            conv_shape = (_output_size(matrix.shape[0] + 2 * padding, kernel.shape[0], stride),
+                          _output_size(matrix.shape[1] + 2 * padding, kernel.shape[1], stride))
+            if pool_size > 0:
+                # Convolution output only feeds the pooling pass; keep it next to the result
+                output_dir = os.path.dirname(os.path.abspath(output_path))
+                handle, intermediate = tempfile.mkstemp(suffix='.npy', dir=output_dir)
+                os.close(handle)
+                conv_out = create_raster(intermediate, conv_shape)
+            else:
+                conv_out = create_raster(output_path, conv_shape)
+            current = convolve_tiled(matrix, kernel, conv_out, stride, padding, tile_rows=tile_rows,
+                                     workers=workers)
+            current.flush()
+        
+        if pool_size > 0:
+            pool_shape = (_output_size(current.shape[0], pool_size, pool_stride),
+                          _output_size(current.shape[1], pool_size, pool_stride))
+            current = pool_tiled(current, create_raster(output_path, pool_shape), pool_size,
+                                 pool_stride, pool_mode, tile_rows, workers)
+            current.flush()
+        return current.shape
+    finally:
+        if intermediate is not None:
+            os.remove(intermediate)
+
+# Multi-core execution splits the output into fixed bands of PARALLEL_BAND_ROWS rows
+# (each with its stride-aware input halo). Band boundaries never depend on the
+# worker count and every band runs the same code as apply_convolution/apply_pooling
+# on the whole matrix, so results are bit-identical to serial execution. FFT plans,
+# whose rounding depends on the transform size, always run serially. BLAS rounds a
+# trailing partial block of GEMM rows differently, so im2col bands must start on a
+# block boundary: PARALLEL_BAND_ROWS is rounded up to a multiple of
+# PARALLEL_BAND_ALIGNMENT. Threads are the default because NumPy releases the GIL
+# inside its kernels; the 'process' backend runs bands in a process pool that reads
+# and writes shared memory. Large single-matrix requests switch to parallel
+# execution above PARALLEL_MIN_CELLS output cells.
+PARALLEL_BACKENDS = ('thread', 'process')
+PARALLEL_WORKERS = int(os.environ.get('PARALLEL_WORKERS', os.cpu_count() or 1))
+PARALLEL_BACKEND = os.environ.get('PARALLEL_BACKEND', 'thread')
+PARALLEL_BAND_ALIGNMENT = 16
+PARALLEL_BAND_ROWS = max(int(os.environ.get('PARALLEL_BAND_ROWS', 64)), 1)
+PARALLEL_BAND_ROWS = -(-PARALLEL_BAND_ROWS // PARALLEL_BAND_ALIGNMENT) * PARALLEL_BAND_ALIGNMENT
+PARALLEL_MIN_CELLS = int(os.environ.get('PARALLEL_MIN_CELLS', 256 * 1024))
+
+def _bands(total_rows, band_rows):
+    return [(start, min(start + band_rows, total_rows)) for start in range(0, total_rows, band_rows)]
+
+def _run_bands(total_rows, band_rows, workers, run_band):
+    """Call run_band(start, stop) for every band, on a thread pool when workers > 1"""
+    bands = _bands(total_rows, band_rows)
+    if workers <= 1 or len(bands) <= 1:
+        for start, stop in bands:
+            run_band(start, stop)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(run_band, start, stop) for start, stop in bands]:
+            future.result()
+
+def _band_worker(op, params, source, target, row_start, row_stop):
+    """Process-pool task: compute one band from shared memory into shared memory"""
+    source_memory = shared_memory.SharedMemory(name=source[0])
+    target_memory = shared_memory.SharedMemory(name=target[0])
+    try:
+        matrix = np.ndarray(source[1], dtype=source[2], buffer=source_memory.buf)
+        out = np.ndarray(target[1], dtype=target[2], buffer=target_memory.buf)
+        out[row_start:row_stop] = _compute_band(op, matrix, params, row_start, row_stop)
+        del matrix, out
+    finally:
+        source_memory.close()
+        target_memory.close()
+
+def _run_bands_in_processes(op, matrix, params, out, band_rows, workers):
+    """Run bands in a process pool; input and output live in shared memory blocks"""
+    source_memory = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    target_memory = shared_memory.SharedMemory(create=True, size=max(out.nbytes, 1))
+    try:
+        shared_input = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=source_memory.buf)
+        shared_input[...] = matrix
+        source = (source_memory.name, matrix.shape, matrix.dtype.str)
+        target = (target_memory.name, out.shape, out.dtype.str)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_band_worker, op, params, source, target, start, stop)
+                       for start, stop in _bands(out.shape[0], band_rows)]
+            for future in futures:
+                future.result()
+        out[...] = np.ndarray(out.shape, dtype=out.dtype, buffer=target_memory.buf)
+        del shared_input
+    finally:
+        source_memory.close()
+        source_memory.unlink()
+        target_memory.close()
+        target_memory.unlink()
+
+def _run_parallel(op, matrix, params, out, workers, backend):
+    workers = PARALLEL_WORKERS if workers is None else workers
+    backend = backend or PARALLEL_BACKEND
+    if backend not in PARALLEL_BACKENDS:
+        raise ValueError(f"Unknown parallel backend: {backend}")
+    if backend == 'process' and workers > 1:
+        _run_bands_in_processes(op, matrix, params, out, PARALLEL_BAND_ROWS, workers)
+    else:
+        _run_bands(out.shape[0], PARALLEL_BAND_ROWS, workers,
+                   lambda start, stop: out.__setitem__(slice(start, stop),
+                                                       _compute_band(op, matrix, params, start, stop)))
+    return out
+
+def parallel_convolution(matrix, kernel, stride=1, padding=0, algorithm='auto', workers=None,
+                         backend=None):
+    """apply_convolution on a 2-D matrix, split into row bands run concurrently
+
+    FFT plans run serially: a band's transform size differs from the whole matrix's,
+    which would change the rounding of every output.
+    """
+    matrix, kernel = _accumulator_operands(matrix, kernel)
+    kh, kw = kernel.shape
+    padded_shape = (matrix.shape[0] + 2 * padding, matrix.shape[1] + 2 * padding)
+    algorithm, _ = plan_convolution(padded_shape, kernel, stride, algorithm)
+    if algorithm == 'fft':
+        return apply_convolution(matrix, kernel, stride, padding, algorithm)
+    out_h = _output_size(padded_shape[0], kh, stride)
+    out_w = _output_size(padded_shape[1], kw, stride)
+    out = np.empty((out_h, out_w), dtype=np.result_type(matrix, kernel))
+    return _run_parallel('conv', matrix, (kernel, stride, padding, algorithm), out, workers, backend)
+
+def parallel_pooling(matrix, pool_size=2, stride=2, mode='max', workers=None, backend=None):
+    """apply_pooling on a 2-D matrix, split into stride- and halo-aware row bands"""
+    if pool_size == 0:  # Pooling disabled
+        return matrix
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown pooling mode: {mode}")
+    out = np.empty((_output_size(matrix.shape[0], pool_size, stride),
+                    _output_size(matrix.shape[1], pool_size, stride)), dtype=_pool_dtype(matrix.dtype, mode))
+    return _run_parallel('pool', matrix, (pool_size, stride, mode), out, workers, backend)
+
+# Content-addressed result cache: keys hash the parsed arrays (dtype, shape, bytes)
+# together with every parameter that affects the result, so identical requests
+# hit regardless of how the payload was encoded. Bounded by RESULT_CACHE_BYTES of
+# cached arrays with least-recently-used eviction.
+RESULT_CACHE_BYTES = int(os.environ.get('RESULT_CACHE_BYTES', 64 * 1024 * 1024))
+# Per-kernel preparation (SVD decomposition, FFT at a given transform size) is kept
+# in its own cache, keyed by kernel content and target shape, so repeated requests
+# with the same filter skip it. im2col needs no prepared kernel: the correlation is
+# contracted against the kernel as-is.
+KERNEL_PLAN_CACHE_BYTES = int(os.environ.get('KERNEL_PLAN_CACHE_BYTES', 32 * 1024 * 1024))
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the total byte size of its values"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+result_cache = LRUCache(RESULT_CACHE_BYTES)
+
+def content_key(*parts):
+    """Hash arrays (dtype, shape and bytes) and plain parameters into a cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            array = np.ascontiguousarray(part)
+            digest.update(f'{array.dtype.str}{array.shape}'.encode('utf-8'))
+            digest.update(memoryview(array.reshape(-1)).cast('B'))
+        else:
+            digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _payload_nbytes(value):
+    """Approximate memory held by a result payload (its arrays plus a small overhead)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return 64 + sum(_payload_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return 64 + sum(_payload_nbytes(item) for item in value)
+    return 16
+
+kernel_plan_cache = LRUCache(KERNEL_PLAN_CACHE_BYTES)
+
+def cached_kernel_decomposition(kernel):
+    """kernel_decomposition, reused across requests with the same kernel"""
+    key = content_key('decomposition', kernel, SEPARABLE_TOLERANCE, SEPARABLE_MAX_RANK)
+    entry = kernel_plan_cache.get(key)
+    if entry is None:
+        factors = kernel_decomposition(kernel)
+        for column, row in factors or []:
+            column.setflags(write=False)
+            row.setflags(write=False)
+        # Wrapped in a tuple so a cached "not separable" (None) still counts as a hit
+        entry = (factors,)
+        kernel_plan_cache.put(key, entry, _payload_nbytes(factors))
+    return entry[0]
+
+def kernel_spectrum(kernel, shape):
+    """rfft2 of the flipped kernel at the given transform size, reused across requests"""
+    key = content_key('spectrum', kernel, shape)
+    spectrum = kernel_plan_cache.get(key)
+    if spectrum is None:
+        spectrum = np.fft.rfft2(kernel[::-1, ::-1], shape)
+        spectrum.setflags(write=False)
+        kernel_plan_cache.put(key, spectrum, spectrum.nbytes)
+    return spectrum
+
+# Step-by-step traces for the convolution animation are generated lazily, one frame
+# per output cell (row-major), and streamed in chunks of TRACE_CHUNK_FRAMES. A
+# response covers at most TRACE_MAX_FRAMES frames from its cursor; clients page
+# through the rest with the returned cursor.
+TRACE_CHUNK_FRAMES = 32
+TRACE_MAX_FRAMES = int(os.environ.get('TRACE_MAX_FRAMES', 2048))
+
+def iter_convolution_trace(matrix, kernel, stride=1, padding=0, start=0, stop=None, dilation=1):
+    """Yield the window, elementwise products and running partial sums of each output cell"""
+    if padding > 0:
+        matrix = _pad_spatial(matrix, padding)
+    windows = _window_view(matrix, kernel.shape, stride, dilation)
+    out_w = windows.shape[1]
+    total = windows.shape[0] * out_w
+    stop = total if stop is None else min(stop, total)
+    for index in range(start, stop):
+        row, col = divmod(index, out_w)
+        window = windows[row, col]
+        products = window * kernel
+        partial_sums = np.cumsum(products.ravel())
+        yield {
+            'index': index,
+            'position': (row, col),
+            'origin': (row * stride - padding, col * stride - padding),
+            'window': window,
+            'products': products,
+            'partial_sums': partial_sums,
+            'value': partial_sums[-1] if partial_sums.size else 0.0
+        }
+
+def _trace_chunks(frames, start, stop, total):
+    """Group frames into chunk payloads that carry the cursor to resume from"""
+    chunk = []
+    cursor = start
+    for frame in frames:
+        chunk.append(frame)
+        cursor = frame['index'] + 1
+        if len(chunk) == TRACE_CHUNK_FRAMES:
+            yield {'frames': chunk, 'cursor': cursor, 'total': total, 'done': cursor >= total}
+            chunk = []
+    if chunk or cursor == start:
+        yield {'frames': chunk, 'cursor': cursor, 'total': total, 'done': cursor >= total}
+
+# Binary transport: a little-endian uint32 header length, a UTF-8 JSON header, then
+# the raw array buffers, each starting on an 8-byte boundary of the data section
+# (which itself starts at the first 8-byte boundary after the header). The header
+# is the usual JSON payload with every array replaced by {"__array__": index} into
+# its "arrays" table of {dtype, shape, offset} entries.
+BINARY_MIMETYPE = 'application/octet-stream'
+BINARY_ALIGNMENT = 8
+BINARY_DTYPES = ('<f8', '<f4', '<i8', '<i4', '<i2', '|i1', '<u4', '<u2', '|u1')
+
+def _aligned(offset):
+    return -(-offset // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+
+def encode_binary_payload(payload):
+    """Serialize a result payload, moving ndarrays into raw aligned buffers"""
+    buffers = []
+    arrays = []
+    offset = 0
+    
+    def extract(value):
+        nonlocal offset
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+            offset = _aligned(offset)
+            arrays.append({'dtype': array.dtype.str, 'shape': array.shape, 'offset': offset})
+            buffers.append((offset, memoryview(array.reshape(-1)).cast('B')))
+            offset += array.nbytes
+            return {'__array__': len(arrays) - 1}
+        if isinstance(value, dict):
+            return {key: extract(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract(item) for item in value]
+        return value
+    
+    header = extract(payload)
+    header['arrays'] = arrays
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _aligned(4 + len(header_bytes))
+    
+    body = bytearray(data_start + offset)
+    body[:4] = struct.pack('<I', len(header_bytes))
+    body[4:4 + len(header_bytes)] = header_bytes
+    for start, buffer in buffers:
+        body[data_start + start:data_start + start + len(buffer)] = buffer
+    return bytes(body)
+
+def decode_binary_payload(body):
+    """Parse a binary request body; arrays are zero-copy views into the body"""
+    if len(body) < 4:
+        raise ValueError("Invalid binary payload: missing header")
+    (header_length,) = struct.unpack_from('<I', body)
+    if 4 + header_length > len(body):
+        raise ValueError("Invalid binary payload: truncated header")
+    header = json.loads(bytes(body[4:4 + header_length]).decode('utf-8'))
+    data_start = _aligned(4 + header_length)
+    
+    arrays = []
+    for entry in header.pop('arrays', []):
+        if entry['dtype'] not in BINARY_DTYPES:
+            raise ValueError(f"Unsupported binary dtype: {entry['dtype']}")
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(int(n) for n in entry['shape'])
+        count = int(np.prod(shape))
+        start = data_start + int(entry['offset'])
+        if start < data_start or start + count * dtype.itemsize > len(body):
+            raise ValueError("Invalid binary payload: array outside body")
+        arrays.append(np.frombuffer(body, dtype=dtype, count=count, offset=start).reshape(shape))
+    
+    def resolve(value):
+        if isinstance(value, dict):
+            if '__array__' in value:
+                return arrays[value['__array__']]
+            return {key: resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        return value
+    
+    return resolve(header)
+
+# JSON responses format arrays straight from NumPy, one row per format operation.
+# A request `precision` (decimal places, at most MAX_PRECISION) rounds float cells
+# and scalars and prints them fixed-point, or as integers when every finite cell is
+# whole; NaN and Infinity cells keep json.dumps' spelling. Without it
+# cells keep their shortest round-trip repr, which json.dumps of the array's list
+# produces faster than per-row formatting can (repr dominates either way), so that
+# path still goes through tolist(). `echo_inputs: false` leaves the inputs
+# (ECHO_KEYS) out of the response, for clients that still hold what they sent.
+MAX_PRECISION = 17
+ECHO_KEYS = ('input_matrix', 'kernel', 'bias')
+
+def _encode_json_array(array, precision):
+    """JSON text of an ndarray without building the nested Python list"""
+    if array.ndim == 0:
+        return _encode_json_array(array.reshape(1), precision)[1:-1]
+    if array.ndim > 2:
+        return '[' + ','.join(_encode_json_array(item, precision) for item in array) + ']'
+    if (precision is None or array.size == 0 or not np.issubdtype(array.dtype, np.number)
+            or np.issubdtype(array.dtype, np.complexfloating)):
+        return json.dumps(array.tolist(), separators=(',', ':'))
+    finite = None
+    if np.issubdtype(array.dtype, np.integer):
+        cell = '%d'
+    else:
+        finite = np.isfinite(array)
+        array = np.round(array, precision)
+        whole = array[finite]
+        cell = '%.0f' if np.all(whole == np.rint(whole)) else f'%.{precision}f'
+    width = array.shape[-1]
+    if finite is not None and not finite.all():
+        # Finite cells are still rounded; NaN/Infinity are spelled per cell as json.dumps does
+        rows = ['[' + ','.join(cell % value if ok else json.dumps(value) for value, ok in zip(row, mask))
+                + ']' for row, mask in zip(array.reshape(-1, width).tolist(), finite.reshape(-1, width).tolist())]
+    else:
+        row_format = '[' + ','.join([cell] * width) + ']'
+        rows = [row_format % tuple(row.tolist()) for row in array.reshape(-1, width)]
+    return '[' + ','.join(rows) + ']' if array.ndim == 2 else rows[0]
+
+def encode_json_payload(value, precision=None):
+    """Serialize a result payload to JSON text, formatting ndarrays directly"""
+    if isinstance(value, np.ndarray):
+        return _encode_json_array(value, precision)
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{json.dumps(str(key))}:{encode_json_payload(item, precision)}'
+                              for key, item in value.items()) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(encode_json_payload(item, precision) for item in value) + ']'
+    if isinstance(value, np.generic) or (isinstance(value, float) and precision is not None):
+        # Scalars (input_scale, values) are rounded like array cells
+        return _encode_json_array(np.asarray(value), precision)
+    return json.dumps(value)
+
+def _without_inputs(value):
+    """Copy of a result payload minus the echoed inputs (the cached payload is not touched)"""
+    if isinstance(value, dict):
+        return {key: _without_inputs(item) for key, item in value.items() if key not in ECHO_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_without_inputs(item) for item in value]
+    return value
+
+def _to_builtin(value):
+    """Convert ndarrays (and the containers holding them) to JSON-serializable values"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(item) for item in value]
+    return value
+
+def _read_payload():
+    """Request payload from a JSON or binary body"""
+    with timed('decode'):
+        if request.mimetype == BINARY_MIMETYPE:
+            return decode_binary_payload(request.get_data())
+        return request.json
+
+def _wants_binary():
+    return request.accept_mimetypes.best_match(['application/json', BINARY_MIMETYPE]) == BINARY_MIMETYPE
+
+def _respond(results, data=None):
+    """Encode results as JSON (default) or as a binary payload when the client accepts it
+
+    `data` is the request payload, whose `precision` and `echo_inputs` shape the response.
+    """
+    data = data or {}
+    if not data.get('echo_inputs', True):
+        results = _without_inputs(results)
+    metrics.inc('convplayground_cells_total', (('direction', 'out'),), count_output_cells(results))
+    if _wants_binary():
+        with timed('encode'):
+            return Response(encode_binary_payload(results), mimetype=BINARY_MIMETYPE)
+    precision = data.get('precision')
+    if precision is not None:
+        precision = min(max(int(precision), 0), MAX_PRECISION)
+    with timed('json'):
+        return Response(encode_json_payload(results, precision), mimetype='application/json')
+
+def result_etag(key, data):
+    """Weak ETag of a result: the computation's cache key plus the options that shape its encoding"""
+    return content_key(key, data.get('precision'), data.get('echo_inputs', True), _wants_binary())
+
+def _not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+def _has_cells(matrix_data):
+    """True when a kernel/matrix payload has at least one cell"""
+    if isinstance(matrix_data, np.ndarray):
+        return matrix_data.size > 0
+    return bool(matrix_data) and len(matrix_data) > 0 and len(matrix_data[0]) > 0
+
+# Admission control: requests are sized before any work is done. Bodies above
+# MAX_REQUEST_BYTES are refused by Flask, payloads above MAX_INPUT_CELLS are refused
+# before parsing, and requests whose estimated cost (multiply-adds for convolution,
+# window reads for pooling) exceeds MAX_REQUEST_COST are refused before executing,
+# all with 413. At most MAX_CONCURRENT_JOBS computations run at once; a request
+# that cannot get a slot within ADMISSION_TIMEOUT seconds gets a 429.
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 32 * 1024 * 1024))
+MAX_INPUT_CELLS = int(os.environ.get('MAX_INPUT_CELLS', 4 * 1024 * 1024))
+MAX_REQUEST_COST = int(os.environ.get('MAX_REQUEST_COST', 2 * 10 ** 9))
+MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', os.cpu_count() or 1))
+ADMISSION_TIMEOUT = float(os.environ.get('ADMISSION_TIMEOUT', 0.05))
+
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+
+class AdmissionError(Exception):
+    """Request refused before execution: 413 (too large or too expensive) or 429 (busy)"""
+    
+    def __init__(self, message, status=413):
+        super().__init__(message)
+        self.status = status
+
+compute_slots = threading.BoundedSemaphore(MAX_CONCURRENT_JOBS)
+
+@contextmanager
+def compute_slot():
+    """Hold one of the MAX_CONCURRENT_JOBS slots, or fail fast with a 429"""
+    if not compute_slots.acquire(timeout=ADMISSION_TIMEOUT):
+        raise AdmissionError("Server is busy, retry shortly", 429)
+    try:
+        yield
+    finally:
+        compute_slots.release()
+
+def count_cells(payload):
+    """Cell count of a raw matrix/tensor payload, without parsing it
+
+    Follows parse_matrix's shape rule: every 2-D level is as wide as its first
+    row, so ragged rows are counted as they will be allocated.
+    """
+    if isinstance(payload, np.ndarray):
+        return payload.size
+    if not isinstance(payload, list):
+        return 1
+    if not payload or not isinstance(payload[0], list):
+        return len(payload)
+    if not payload[0] or not isinstance(payload[0][0], list):
+        return len(payload) * len(payload[0])
+    return sum(count_cells(item) for item in payload)
+
+def check_input_cells(*payloads):
+    cells = sum(count_cells(payload) for payload in payloads if payload is not None)
+    metrics.inc('convplayground_cells_total', (('direction', 'in'),), cells)
+    if cells > MAX_INPUT_CELLS:
+        raise AdmissionError(f"Request has {cells} cells, the limit is {MAX_INPUT_CELLS}")
+
+def check_cost(cost):
+    if cost > MAX_REQUEST_COST:
+        raise AdmissionError(f"Request would cost {cost} operations, the limit is {MAX_REQUEST_COST}")
+
+def conv_output_shape(input_shape, kernel_shape, stride=1, padding=0, dilation=1):
+    """Result shape of apply_convolution for the given input and kernel shapes"""
+    out_h = _output_size(input_shape[-2] + 2 * padding, _dilated_size(kernel_shape[-2], dilation), stride)
+    out_w = _output_size(input_shape[-1] + 2 * padding, _dilated_size(kernel_shape[-1], dilation), stride)
+    out_channels = kernel_shape[0] if len(kernel_shape) == 4 else 1
+    if len(input_shape) == 4:
+        return (input_shape[0], out_channels, out_h, out_w)
+    if len(input_shape) == 3 or len(kernel_shape) == 4:
+        return (out_channels, out_h, out_w)
+    return (out_h, out_w)
+
+def conv_cost(input_shape, kernel_shape, stride=1, padding=0, dilation=1):
+    """Multiply-adds: output cells × kernel cells per output (over its group's input channels)"""
+    per_output = kernel_shape[1:] if len(kernel_shape) == 4 else kernel_shape
+    output_shape = conv_output_shape(input_shape, kernel_shape, stride, padding, dilation)
+    return int(np.prod(output_shape)) * int(np.prod(per_output))
+
+def pool_cost(input_shape, pool_size, stride):
+    """Window reads: pooled cells × pool area"""
+    if pool_size <= 0:
+        return 0
+    return int(np.prod(_pool_output_shape(input_shape, pool_size, stride))) * pool_size * pool_size
+
+def pipeline_cost(stages, input_shape):
+    """Estimated cost of compiled pipeline stages, following shapes through them"""
+    shape = tuple(input_shape)
+    cost = 0
+    for stage in stages:
+        layer = stage['layer']
+        if stage['op'] == 'conv':
+            cost += conv_cost(shape, layer['kernel'].shape, layer['stride'], layer['padding'],
+                              layer['dilation'])
+            shape = conv_output_shape(shape, layer['kernel'].shape, layer['stride'], layer['padding'],
+                                      layer['dilation'])
+        elif stage['op'] == 'pool':
+            cost += pool_cost(shape, layer['size'], layer['stride'])
+            shape = _pool_output_shape(shape, layer['size'], layer['stride'])
+        elif stage['op'] == 'pad':
+            shape = shape[:-2] + (shape[-2] + 2 * layer['padding'], shape[-1] + 2 * layer['padding'])
+        cost += len(stage['epilogue']) * int(np.prod(shape))
+    return cost
+
+def _error_response(error):
+    """JSON error response: admission and HTTP errors keep their status, the rest are 400"""
+    if isinstance(error, AdmissionError):
+        response = jsonify({'error': str(error)})
+        response.status_code = error.status
+        if error.status == 429:
+            response.headers['Retry-After'] = '1'
+        return response
+    if isinstance(error, HTTPException):
+        return jsonify({'error': error.description}), error.code
+    return jsonify({'error': str(error)}), 400
+
+# Instrumentation: hot-path stages (decode, parse, cache_key, pad, convolution,
+# pooling, json, encode) are timed with `timed(stage)` into per-stage
+# latency histograms, next to per-endpoint request latency, byte and cell counters.
+# /metrics serves them in Prometheus text format (per worker process). With
+# SERVER_TIMING on, each response lists its own stages in a Server-Timing header;
+# `pad` runs inside `convolution`, so its time is also counted there.
+METRICS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+METRICS_HELP = {
+    'convplayground_request_seconds': ('histogram', 'Request latency by endpoint'),
+    'convplayground_stage_seconds': ('histogram', 'Latency of hot-path stages'),
+    'convplayground_request_bytes_total': ('counter', 'Request body bytes by endpoint'),
+    'convplayground_response_bytes_total': ('counter', 'Response body bytes by endpoint (unstreamed)'),
+    'convplayground_cells_total': ('counter', 'Matrix cells received (in) and serialized (out)'),
+}
+
+class Histogram:
+    """Cumulative-bucket histogram with Prometheus `le` semantics"""
+    
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    """Thread-safe histograms and counters keyed by metric name and label pairs"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+    
+    def observe(self, name, labels, value):
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[(name, labels)] = Histogram()
+            histogram.observe(value)
+    
+    def inc(self, name, labels, amount=1):
+        with self.lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0) + amount
+    
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+    
+    def render(self):
+        """Prometheus text exposition (format 0.0.4)"""
+        def label_text(labels, *extra):
+            pairs = [f'{key}="{value}"' for key, value in labels + extra]
+            return '{' + ','.join(pairs) + '}' if pairs else ''
+        
+        with self.lock:
+            lines = []
+            for name, (kind, help_text) in METRICS_HELP.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                if kind == 'counter':
+                    for (metric, labels), value in sorted(self.counters.items()):
+                        if metric == name:
+                            lines.append(f'{name}{label_text(labels)} {value}')
+                    continue
+                for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{label_text(labels, ("le", bound))} {cumulative}')
+                    lines.append(f'{name}_sum{label_text(labels)} {histogram.sum}')
+                    lines.append(f'{name}_count{label_text(labels)} {histogram.count}')
+            return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+@contextmanager
+def timed(stage):
+    """Time a hot-path stage into its histogram and, inside a request, its Server-Timing entry"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe('convplayground_stage_seconds', (('stage', stage),), elapsed)
+        if has_request_context():
+            timings = g.setdefault('timings', {})
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    labels = (('endpoint', request.endpoint or 'unknown'),)
+    metrics.observe('convplayground_request_seconds', labels, elapsed)
+    metrics.inc('convplayground_request_bytes_total', labels, request.content_length or 0)
+    if not response.is_streamed:
+        metrics.inc('convplayground_response_bytes_total', labels, response.content_length or 0)
+    if SERVER_TIMING:
+        entries = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in g.get('timings', {}).items()]
+        entries.append(f'total;dur={elapsed * 1000:.3f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+def count_output_cells(value):
+    """Cells of every ndarray in a result payload"""
+    if isinstance(value, np.ndarray):
+        return value.size
+    if isinstance(value, dict):
+        return sum(count_output_cells(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(count_output_cells(item) for item in value)
+    return 0
+
+# Response compression: bodies of at least COMPRESS_MIN_BYTES with a text mimetype
+# are gzipped for clients that send `Accept-Encoding: gzip` (stdlib only, so no
+# brotli). Bodies above COMPRESS_STREAM_BYTES are compressed chunk by chunk as they
+# are sent rather than into a second full-size buffer first; the uncompressed body
+# itself is already encoded in memory and stays there until the last chunk is sent.
+# Compression makes the bytes differ from the identity encoding, so a strong ETag is
+# weakened.
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_STREAM_BYTES = int(os.environ.get('COMPRESS_STREAM_BYTES', 1024 * 1024))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+COMPRESS_CHUNK_BYTES = 64 * 1024
+COMPRESS_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+def _gzip_chunks(body):
+    """Gzip `body` incrementally, one COMPRESS_CHUNK_BYTES slice at a time
+
+    Runs while the response is sent, after Server-Timing has gone out, so its
+    compression time is recorded into the stage histogram once the body is done.
+    """
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    view = memoryview(body)
+    elapsed = 0.0
+    try:
+        for start in range(0, len(view), COMPRESS_CHUNK_BYTES):
+            began = time.perf_counter()
+            chunk = compressor.compress(view[start:start + COMPRESS_CHUNK_BYTES])
+            elapsed += time.perf_counter() - began
+            if chunk:
+                yield chunk
+        began = time.perf_counter()
+        chunk = compressor.flush()
+        elapsed += time.perf_counter() - began
+        yield chunk
+    finally:
+        metrics.observe('convplayground_stage_seconds', (('stage', 'compress'),), elapsed)
+
+@app.after_request
+def _compress_response(response):
+    if response.mimetype not in COMPRESS_MIMETYPES or response.direct_passthrough or response.is_streamed:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or request.accept_encodings.quality('gzip') <= 0):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    if len(body) > COMPRESS_STREAM_BYTES:
+        response.response = _gzip_chunks(body)
+        response.headers.pop('Content-Length', None)
+    else:
+        with timed('compress'):
+            response.set_data(gzip.compress(body, COMPRESS_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
 <html lang="en">
@@ -74,6 +1631,10 @@ HTML_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Neural Matrix Visualizer</title>
+    {% if assets %}
+    <link href="{{ assets['tailwind.css'] }}" rel="stylesheet">
+    <link href="{{ assets['fontawesome.css'] }}" rel="stylesheet">
+    {% else %}
     <script src="https://cdn.tailwindcss.com"></script>
     <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
     <script>
@@ -116,6 +1677,7 @@ HTML_TEMPLATE = '''
             }
         }
     </script>
+    {% endif %}
     <style>
         .matrix-grid {
             display: grid;
@@ -289,6 +1851,18 @@ HTML_TEMPLATE = '''
                                 class="w-full p-2 md:p-3 bg-gray-700 border border-gray-600 rounded-lg focus:ring-2 focus:ring-cyan-500 focus:border-transparent transition-all text-sm md:text-base"
                             >
                         </div>
+                        
+                        <!-- Dilation -->
+                        <div>
+                            <label class="block text-gray-300 text-sm md:text-base font-medium mb-1 md:mb-2">Dilation</label>
+                            <input 
+                                type="number" 
+                                id="dilationInput" 
+                                min="1" 
+                                value="1"
+                                class="w-full p-2 md:p-3 bg-gray-700 border border-gray-600 rounded-lg focus:ring-2 focus:ring-cyan-500 focus:border-transparent transition-all text-sm md:text-base"
+                            >
+                        </div>
                     </div>
                     
                     <!-- Pooling Section -->
@@ -401,6 +1975,16 @@ HTML_TEMPLATE = '''
             document.getElementById('kernelRows').addEventListener('input', generateKernelGrid);
             document.getElementById('kernelCols').addEventListener('input', generateKernelGrid);
             
+            // After a run, edits to input cells are sent as deltas; any other change
+            // (kernel, sizes, parameters) ends the session until the next full run
+            document.getElementById('matrixForm').addEventListener('input', function(e) {
+                if (document.getElementById('matrixGrid').contains(e.target)) {
+                    queueCellEdit(e.target);
+                } else {
+                    editSession = null;
+                }
+            });
+            
             // Pooling toggle
             document.getElementById('poolingToggle').addEventListener('change', function() {
                 const poolingParams = document.getElementById('poolingParams');
@@ -418,10 +2002,82 @@ HTML_TEMPLATE = '''
             }, 100);
         });
         
+        // Incremental edits (see /process_matrix/delta): changed cells are batched for
+        // EDIT_DEBOUNCE_MS, sent in order, and the returned output regions patched into
+        // the displayed matrices in place.
+        const EDIT_DEBOUNCE_MS = 60;
+        const pendingEdits = new Map();
+        let editSession = null;
+        let editTimer = null;
+        let editRequests = Promise.resolve();
+        
+        function queueCellEdit(input) {
+            if (!editSession) return;
+            const row = parseInt(input.dataset.row);
+            const col = parseInt(input.dataset.col);
+            pendingEdits.set(`${row},${col}`, { row: row, col: col, value: parseFloat(input.value) || 0 });
+            clearTimeout(editTimer);
+            editTimer = setTimeout(sendCellEdits, EDIT_DEBOUNCE_MS);
+        }
+        
+        function sendCellEdits() {
+            const session = editSession;
+            const cells = Array.from(pendingEdits.values());
+            pendingEdits.clear();
+            if (!session || cells.length === 0) return;
+            
+            editRequests = editRequests.then(() => fetch('/process_matrix/delta', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ session_id: session.id, cells: cells, precision: RESPONSE_PRECISION })
+            }))
+            .then(response => response.json())
+            .then(update => {
+                if (session !== editSession) return;
+                if (update.error) {
+                    // Expired or unknown session: the next full run starts a new one
+                    editSession = null;
+                    return;
+                }
+                applyCellEdits(session.data, cells, update);
+            })
+            .catch(() => {
+                editSession = null;
+            });
+        }
+        
+        function applyCellEdits(data, cells, update) {
+            cells.forEach(cell => patchMatrix('input', data.input_matrix, cell.row, cell.col, [[cell.value]]));
+            data.operations.forEach(op => {
+                const region = update[op.type];
+                if (region && region.values.length > 0) {
+                    patchMatrix(op.type, op.result, region.offset[0], region.offset[1], region.values);
+                }
+            });
+        }
+        
+        function patchMatrix(type, matrix, row, col, values) {
+            values.forEach((line, i) => line.forEach((value, j) => {
+                matrix[row + i][col + j] = value;
+            }));
+            const cols = matrix[0].length;
+            document.querySelectorAll(`[data-matrix-key="${type}"]`).forEach(view => {
+                if (view.refreshMatrix) {
+                    view.refreshMatrix();
+                    return;
+                }
+                values.forEach((line, i) => line.forEach((value, j) => {
+                    const cell = view.children[(row + i) * cols + col + j];
+                    if (cell) cell.textContent = value.toFixed(2);
+                }));
+            });
+        }
+        
         function generateMatrixGrid() {
             const rows = parseInt(document.getElementById('matrixRows').value) || 4;
             const cols = parseInt(document.getElementById('matrixCols').value) || 4;
             const container = document.getElementById('matrixGrid');
+            editSession = null;
             
             container.innerHTML = '';
             container.style.gridTemplateColumns = `repeat(${cols}, minmax(40px, 1fr))`;
@@ -507,6 +2163,222 @@ HTML_TEMPLATE = '''
             });
         }
         
+        // Binary transport (see encode_binary_payload in app.py): uint32 header length,
+        // JSON header, then raw little-endian buffers aligned to 8 bytes.
+        const BINARY_MIMETYPE = 'application/octet-stream';
+        const BINARY_TRANSPORT_MIN_CELLS = 4096;
+        // Cells are shown with two decimals; four keep the trace sums consistent
+        const RESPONSE_PRECISION = 4;
+        const BINARY_DTYPES = {
+            '<f8': Float64Array, '<f4': Float32Array, '<i8': BigInt64Array, '<i4': Int32Array,
+            '<i2': Int16Array, '|i1': Int8Array, '<u4': Uint32Array, '<u2': Uint16Array, '|u1': Uint8Array
+        };
+        
+        function alignBinary(offset) {
+            return Math.ceil(offset / 8) * 8;
+        }
+        
+        function toFloat64Matrix(rows) {
+            const height = rows.length;
+            const width = height ? rows[0].length : 0;
+            const data = new Float64Array(height * width);
+            rows.forEach((row, i) => data.set(row, i * width));
+            return { data: data, shape: [height, width] };
+        }
+        
+        function encodeBinaryPayload(payload) {
+            const arrays = [];
+            const buffers = [];
+            let offset = 0;
+            const header = JSON.parse(JSON.stringify(payload, (key, value) => {
+                if (value && value.data instanceof Float64Array && value.shape) {
+                    offset = alignBinary(offset);
+                    arrays.push({ dtype: '<f8', shape: value.shape, offset: offset });
+                    buffers.push([offset, value.data]);
+                    offset += value.data.byteLength;
+                    return { __array__: arrays.length - 1 };
+                }
+                return value;
+            }));
+            header.arrays = arrays;
+            
+            const headerBytes = new TextEncoder().encode(JSON.stringify(header));
+            const dataStart = alignBinary(4 + headerBytes.length);
+            const body = new Uint8Array(dataStart + offset);
+            new DataView(body.buffer).setUint32(0, headerBytes.length, true);
+            body.set(headerBytes, 4);
+            buffers.forEach(([start, data]) => {
+                body.set(new Uint8Array(data.buffer, data.byteOffset, data.byteLength), dataStart + start);
+            });
+            return body.buffer;
+        }
+        
+        function decodeBinaryPayload(buffer) {
+            // Arrays come back as { data: TypedArray, shape } views into the buffer
+            const headerLength = new DataView(buffer).getUint32(0, true);
+            const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+            const dataStart = alignBinary(4 + headerLength);
+            const arrays = header.arrays.map(entry => {
+                const TypedArray = BINARY_DTYPES[entry.dtype];
+                const count = entry.shape.reduce((a, b) => a * b, 1);
+                return { data: new TypedArray(buffer, dataStart + entry.offset, count), shape: entry.shape };
+            });
+            delete header.arrays;
+            
+            const resolve = value => {
+                if (Array.isArray(value)) return value.map(resolve);
+                if (value && typeof value === 'object') {
+                    if ('__array__' in value) return arrays[value.__array__];
+                    Object.keys(value).forEach(key => { value[key] = resolve(value[key]); });
+                }
+                return value;
+            };
+            return resolve(header);
+        }
+        
+        function toRows(array) {
+            // Nested arrays in the decoded array's shape (rows for 2-D, slices of rows above)
+            const shape = array.shape;
+            const build = (offset, dim) => {
+                if (dim === shape.length - 1) {
+                    return Array.from(array.data.subarray(offset, offset + shape[dim]), Number);
+                }
+                const step = shape.slice(dim + 1).reduce((a, b) => a * b, 1);
+                const items = [];
+                for (let i = 0; i < shape[dim]; i++) {
+                    items.push(build(offset + i * step, dim + 1));
+                }
+                return items;
+            };
+            return build(0, 0);
+        }
+        
+        function materializeRows(value) {
+            // Replace decoded typed arrays with nested rows for renderMatrix
+            if (Array.isArray(value)) return value.map(materializeRows);
+            if (value && typeof value === 'object') {
+                if (ArrayBuffer.isView(value.data) && value.shape) return toRows(value);
+                Object.keys(value).forEach(key => { value[key] = materializeRows(value[key]); });
+            }
+            return value;
+        }
+        
+        // Step-by-step trace: frames stream from /trace as NDJSON chunks and are played
+        // back one output cell at a time, fetching the next page as the queue drains.
+        const TRACE_FRAME_MS = 400;
+        const TRACE_PAGE_FRAMES = 256;
+        const TRACE_PREFETCH_FRAMES = 32;
+        let lastFormData = null;
+        let traceSession = null;
+        
+        function streamConvolutionTrace(payload, onChunk) {
+            return fetch('/trace', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/x-ndjson',
+                },
+                body: JSON.stringify(payload)
+            })
+            .then(response => {
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffered = '';
+                const handle = line => {
+                    const chunk = JSON.parse(line);
+                    if (chunk.error) throw new Error(chunk.error);
+                    onChunk(chunk);
+                };
+                const pump = () => reader.read().then(({ done, value }) => {
+                    if (done) {
+                        if (buffered.trim()) handle(buffered);
+                        return;
+                    }
+                    buffered += decoder.decode(value, { stream: true });
+                    const lines = buffered.split('\\n');
+                    buffered = lines.pop();
+                    lines.filter(line => line.trim()).forEach(handle);
+                    return pump();
+                });
+                return pump();
+            });
+        }
+        
+        function startTrace() {
+            if (!lastFormData) return;
+            stopTrace();
+            const session = {
+                payload: {
+                    matrix: lastFormData.matrix,
+                    kernel: lastFormData.kernel,
+                    stride: lastFormData.stride,
+                    padding: lastFormData.padding,
+                    dilation: lastFormData.dilation
+                },
+                queue: [],
+                cursor: 0,
+                total: null,
+                loading: false,
+                timer: null
+            };
+            traceSession = session;
+            fetchTracePage(session);
+            session.timer = setInterval(() => showNextTraceFrame(session), TRACE_FRAME_MS);
+        }
+        
+        function stopTrace() {
+            if (traceSession) {
+                clearInterval(traceSession.timer);
+                traceSession = null;
+            }
+        }
+        
+        function fetchTracePage(session) {
+            if (session.loading || (session.total !== null && session.cursor >= session.total)) return;
+            session.loading = true;
+            const payload = Object.assign({}, session.payload, { cursor: session.cursor, limit: TRACE_PAGE_FRAMES });
+            streamConvolutionTrace(payload, chunk => {
+                session.total = chunk.total;
+                session.cursor = chunk.cursor;
+                session.queue.push(...chunk.frames);
+            })
+            .then(() => { session.loading = false; })
+            .catch(error => {
+                console.error('Error:', error);
+                stopTrace();
+            });
+        }
+        
+        function showNextTraceFrame(session) {
+            if (session !== traceSession) return;
+            if (session.queue.length < TRACE_PREFETCH_FRAMES) fetchTracePage(session);
+            const frame = session.queue.shift();
+            const view = document.getElementById('traceView');
+            if (!frame || !view) {
+                if (!view || (!session.loading && session.cursor >= session.total)) stopTrace();
+                return;
+            }
+            view.innerHTML = `
+                <p class="text-gray-300 text-sm mb-2">
+                    Output cell (${frame.position[0]}, ${frame.position[1]}) • step ${frame.index + 1} of ${session.total}
+                </p>
+                <div class="grid grid-cols-1 md:grid-cols-2 gap-4 mb-2">
+                    <div>
+                        <p class="text-gray-300 text-sm mb-1">Window:</p>
+                        ${renderMatrix(frame.window, 'input', 'trace-window')}
+                    </div>
+                    <div>
+                        <p class="text-gray-300 text-sm mb-1">Window × Kernel:</p>
+                        ${renderMatrix(frame.products, 'kernel', 'trace-products')}
+                    </div>
+                </div>
+                <p class="text-gray-300 text-sm">
+                    Partial sums: ${frame.partial_sums.map(value => value.toFixed(2)).join(' → ')}
+                    = <span class="digital-text font-bold">${frame.value.toFixed(2)}</span>
+                </p>
+            `;
+        }
+        
         function getMatrixData(gridId) {
             const inputs = document.querySelectorAll(`#${gridId} input`);
             if (inputs.length === 0) return [];
@@ -550,26 +2422,47 @@ HTML_TEMPLATE = '''
             document.getElementById('visualizationSteps').classList.add('hidden');
             
             // Gather form data
-            const formData = {
+            const formData = lastFormData = {
                 matrix: getMatrixData('matrixGrid'),
                 kernel: getMatrixData('kernelGrid'),
                 stride: document.getElementById('strideInput').value,
                 padding: document.getElementById('paddingInput').value,
+                dilation: document.getElementById('dilationInput').value,
                 pool_size: document.getElementById('poolingToggle').checked ? 
                           document.getElementById('poolSizeInput').value : 0,
                 pool_stride: document.getElementById('poolStrideInput').value,
-                pool_mode: document.querySelector('input[name="poolMode"]:checked').value
+                pool_mode: document.querySelector('input[name="poolMode"]:checked').value,
+                precision: RESPONSE_PRECISION,
+                echo_inputs: false,
+                session: true
             };
             
-            // Send request to server
-            fetch('/process_matrix', {
+            // Send request to server (large grids go as raw float buffers)
+            const cellCount = formData.matrix.length * (formData.matrix[0] || []).length;
+            const request = cellCount >= BINARY_TRANSPORT_MIN_CELLS ? {
+                method: 'POST',
+                headers: {
+                    'Content-Type': BINARY_MIMETYPE,
+                    'Accept': BINARY_MIMETYPE,
+                },
+                body: encodeBinaryPayload(Object.assign({}, formData, {
+                    matrix: toFloat64Matrix(formData.matrix),
+                    kernel: toFloat64Matrix(formData.kernel)
+                }))
+            } : {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify(formData)
+            };
+            fetch('/process_matrix', request)
+            .then(response => {
+                if (response.headers.get('Content-Type') === BINARY_MIMETYPE) {
+                    return response.arrayBuffer().then(buffer => materializeRows(decodeBinaryPayload(buffer)));
+                }
+                return response.json();
             })
-            .then(response => response.json())
             .then(data => {
                 if (data.error) {
                     resultsContainer.innerHTML = `
@@ -581,6 +2474,8 @@ HTML_TEMPLATE = '''
                 }
                 
                 // Display results
+                restoreInputs(data, formData);
+                editSession = data.session_id ? { id: data.session_id, data: data } : null;
                 displayResults(data);
                 // Show visualization steps
                 document.getElementById('visualizationSteps').classList.remove('hidden');
@@ -596,6 +2491,17 @@ HTML_TEMPLATE = '''
             });
         });
         
+        function restoreInputs(data, formData) {
+            // The request asked not to echo its inputs back; reuse the ones we sent
+            data.input_matrix = data.input_matrix || formData.matrix;
+            data.operations.forEach(op => {
+                if (op.type === 'convolution' && !op.kernel) {
+                    op.kernel = formData.kernel;
+                }
+            });
+            return data;
+        }
+        
         function displayResults(data) {
             const resultsContainer = document.getElementById('resultsContainer');
             let html = '';
@@ -606,10 +2512,10 @@ HTML_TEMPLATE = '''
                     <h3 class="text-lg md:text-xl font-bold text-white mb-3 md:mb-4 flex items-center">
                         <i class="fas fa-th mr-2 text-green-400"></i> Input Matrix
                         <span class="ml-auto text-xs md:text-sm font-normal bg-green-900 text-green-300 px-2 md:px-3 py-1 rounded-full">
-                            ${data.input_shape[0]} × ${data.input_shape[1]}
+                            ${formatShape(data.input_shape)}
                         </span>
                     </h3>
-                    ${renderMatrix(data.input_matrix, 'input')}
+                    ${renderTensor(data.input_matrix, 'input')}
                 </div>
             `;
             
@@ -632,18 +2538,21 @@ HTML_TEMPLATE = '''
                             <h3 class="text-lg md:text-xl font-bold text-white mb-3 md:mb-4 flex items-center">
                                 <i class="fas fa-filter mr-2 text-blue-400"></i> Convolution Result
                                 <span class="ml-auto text-xs md:text-sm font-normal bg-blue-900 text-blue-300 px-2 md:px-3 py-1 rounded-full">
-                                    ${op.result_shape[0]} × ${op.result_shape[1]}
+                                    ${formatShape(op.result_shape)}
                                 </span>
                             </h3>
                             <div class="mb-3 md:mb-4">
                                 <h4 class="font-medium text-gray-300 text-sm md:text-base mb-1 md:mb-2">Convolution Kernel:</h4>
-                                ${renderMatrix(op.kernel, 'kernel')}
+                                ${renderTensor(op.kernel, 'kernel')}
                             </div>
                             <div class="mb-3 md:mb-4 text-xs md:text-sm text-gray-400">
                                 <span class="bg-gray-700 px-2 md:px-3 py-1 rounded mr-2">Stride: ${op.stride}</span>
-                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded">Padding: ${op.padding}</span>
+                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded mr-2">Padding: ${op.padding}</span>
+                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded mr-2">Dilation: ${op.dilation}</span>
+                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded mr-2">Algorithm: ${op.algorithm}</span>
+                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded">Kernel: ${op.decomposition.type === 'separable' ? `rank-${op.decomposition.rank} separable` : 'full'}</span>
                             </div>
-                            ${renderMatrix(op.result, 'convolution')}
+                            ${renderTensor(op.result, 'convolution')}
                         </div>
                     `;
                 } else if (op.type === 'pooling') {
@@ -652,26 +2561,32 @@ HTML_TEMPLATE = '''
                             <h3 class="text-lg md:text-xl font-bold text-white mb-3 md:mb-4 flex items-center">
                                 <i class="fas fa-layer-group mr-2 text-purple-400"></i> ${op.mode.charAt(0).toUpperCase() + op.mode.slice(1)} Pooling
                                 <span class="ml-auto text-xs md:text-sm font-normal bg-purple-900 text-purple-300 px-2 md:px-3 py-1 rounded-full">
-                                    ${op.result_shape[0]} × ${op.result_shape[1]}
+                                    ${formatShape(op.result_shape)}
                                 </span>
                             </h3>
                             <div class="mb-3 md:mb-4 text-xs md:text-sm text-gray-400">
                                 <span class="bg-gray-700 px-2 md:px-3 py-1 rounded mr-2">Pool Size: ${op.pool_size}</span>
-                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded">Pool Stride: ${op.pool_stride}</span>
+                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded mr-2">Pool Stride: ${op.pool_stride}</span>
+                                <span class="bg-gray-700 px-2 md:px-3 py-1 rounded">Method: ${op.method}</span>
                             </div>
-                            ${renderMatrix(op.result, 'pooling')}
+                            ${renderTensor(op.result, 'pooling')}
                         </div>
                     `;
                 }
             });
             
             resultsContainer.innerHTML = html;
+            mountMatrixCanvases(resultsContainer);
             
-            // Add animation to matrix cells after rendering
+            // Add animation to matrix cells after rendering (an animation per cell
+            // stalls the page once there are more than a few hundred of them)
             setTimeout(() => {
-                document.querySelectorAll('.matrix-cell').forEach(cell => {
-                    cell.classList.add('pulse');
-                });
+                const cells = document.querySelectorAll('.matrix-cell');
+                if (cells.length <= PULSE_MAX_CELLS) {
+                    cells.forEach(cell => {
+                        cell.classList.add('pulse');
+                    });
+                }
             }, 500);
         }
         
@@ -686,8 +2601,8 @@ HTML_TEMPLATE = '''
                         <div class="bg-cyan-600 text-white rounded-full w-6 h-6 flex items-center justify-center text-sm font-bold mr-2">1</div>
                         <h4 class="font-bold text-white">Input Matrix</h4>
                     </div>
-                    <p class="text-gray-300 text-sm mb-2">Original matrix with shape ${data.input_shape[0]} × ${data.input_shape[1]}</p>
-                    ${renderMatrix(data.input_matrix, 'input')}
+                    <p class="text-gray-300 text-sm mb-2">Original matrix with shape ${formatShape(data.input_shape)}</p>
+                    ${renderTensor(data.input_matrix, 'input')}
                 </div>
             `;
             
@@ -700,17 +2615,23 @@ HTML_TEMPLATE = '''
                                 <div class="bg-blue-600 text-white rounded-full w-6 h-6 flex items-center justify-center text-sm font-bold mr-2">${index+2}</div>
                                 <h4 class="font-bold text-white">Convolution Operation</h4>
                             </div>
-                            <p class="text-gray-300 text-sm mb-2">Applied kernel with stride ${op.stride} and padding ${op.padding}</p>
+                            <p class="text-gray-300 text-sm mb-2">Applied kernel with stride ${op.stride}, padding ${op.padding} and dilation ${op.dilation}</p>
                             <div class="grid grid-cols-1 md:grid-cols-2 gap-4 mb-2">
                                 <div>
                                     <p class="text-gray-300 text-sm mb-1">Kernel:</p>
-                                    ${renderMatrix(op.kernel, 'kernel')}
+                                    ${renderTensor(op.kernel, 'kernel')}
                                 </div>
                                 <div>
                                     <p class="text-gray-300 text-sm mb-1">Result:</p>
-                                    ${renderMatrix(op.result, 'convolution')}
+                                    ${renderTensor(op.result, 'convolution')}
                                 </div>
                             </div>
+                            ${op.result_shape.length === 2 ? `
+                                <button type="button" onclick="startTrace()" class="bg-gray-700 hover:bg-gray-600 text-cyan-300 text-sm px-3 py-1 rounded mb-2">
+                                    <i class="fas fa-play mr-1"></i> Watch step by step
+                                </button>
+                                <div id="traceView"></div>
+                            ` : ''}
                         </div>
                     `;
                 } else if (op.type === 'pooling') {
@@ -721,7 +2642,7 @@ HTML_TEMPLATE = '''
                                 <h4 class="font-bold text-white">${op.mode.charAt(0).toUpperCase() + op.mode.slice(1)} Pooling</h4>
                             </div>
                             <p class="text-gray-300 text-sm mb-2">Applied ${op.mode} pooling with size ${op.pool_size} and stride ${op.pool_stride}</p>
-                            ${renderMatrix(op.result, 'pooling')}
+                            ${renderTensor(op.result, 'pooling')}
                         </div>
                     `;
                 }
@@ -736,20 +2657,44 @@ HTML_TEMPLATE = '''
                             <div class="bg-green-600 text-white rounded-full w-6 h-6 flex items-center justify-center text-sm font-bold mr-2">${data.operations.length + 2}</div>
                             <h4 class="font-bold text-white">Final Output</h4>
                         </div>
-                        <p class="text-gray-300 text-sm mb-2">Final matrix shape: ${lastOp.result_shape[0]} × ${lastOp.result_shape[1]}</p>
-                        ${renderMatrix(lastOp.result, lastOp.type)}
+                        <p class="text-gray-300 text-sm mb-2">Final matrix shape: ${formatShape(lastOp.result_shape)}</p>
+                        ${renderTensor(lastOp.result, lastOp.type)}
                     </div>
                 `;
             }
             
             stepsContainer.innerHTML = html;
+            mountMatrixCanvases(stepsContainer);
+        }
+        
+        function formatShape(shape) {
+            return shape.join(' × ');
         }
         
-        function renderMatrix(matrix, type) {
+        function renderTensor(tensor, type, label = '') {
+            // Multi-channel tensors render as one labelled 2-D grid per leading index
+            if (!Array.isArray(tensor[0]) || !Array.isArray(tensor[0][0])) {
+                return renderMatrix(tensor, type);
+            }
+            return tensor.map((slice, index) => {
+                const name = label ? `${label}, ${index}` : `${index}`;
+                if (Array.isArray(slice[0]) && Array.isArray(slice[0][0])) {
+                    return renderTensor(slice, type, name);
+                }
+                return `<div class="mb-2"><p class="text-gray-400 text-xs mb-1">[${name}]</p>${renderMatrix(slice, type)}</div>`;
+            }).join('');
+        }
+        
+        // `key` names the matrix a view shows, so cell edits only patch views of that
+        // matrix (trace windows share the input's colours but not its indices)
+        function renderMatrix(matrix, type, key = type) {
             const rows = matrix.length;
             const cols = matrix[0] ? matrix[0].length : 0;
+            if (rows * cols > CANVAS_MIN_CELLS) {
+                return renderMatrixCanvas(matrix, key);
+            }
             
-            let html = `<div class="inline-block border border-gray-700 rounded-lg overflow-auto" style="display: grid; grid-template-columns: repeat(${cols}, minmax(40px, 1fr)); gap: 2px;">`;
+            let html = `<div class="inline-block border border-gray-700 rounded-lg overflow-auto" data-matrix-key="${key}" style="display: grid; grid-template-columns: repeat(${cols}, minmax(40px, 1fr)); gap: 2px;">`;
             
             matrix.forEach(row => {
                 row.forEach(cell => {
@@ -769,70 +2714,836 @@ HTML_TEMPLATE = '''
             if (type === 'pooling') return 'bg-purple-900 hover:bg-purple-800';
             return 'bg-gray-800 hover:bg-gray-700';
         }
+        
+        // Matrices above CANVAS_MIN_CELLS render into a canvas that only draws the cells
+        // in view, coloured on a heatmap scale, with values once cells are large enough
+        // to read. Scroll zooms around the pointer, dragging pans. renderMatrix returns
+        // HTML strings, so canvases are created by mountMatrixCanvases once inserted.
+        const CANVAS_MIN_CELLS = 2500;
+        const CANVAS_HEIGHT = 360;
+        const CANVAS_MAX_CELL_SIZE = 64;
+        const CANVAS_LABEL_MIN_CELL_SIZE = 36;
+        const PULSE_MAX_CELLS = 400;
+        const HEATMAP_STOPS = [[13, 8, 135], [126, 3, 168], [204, 71, 120], [248, 149, 64], [240, 249, 33]];
+        const HEATMAP = buildHeatmap(256);
+        const pendingCanvases = [];
+        
+        function buildHeatmap(steps) {
+            const colors = [];
+            for (let i = 0; i < steps; i++) {
+                const position = i / (steps - 1) * (HEATMAP_STOPS.length - 1);
+                const lower = Math.min(Math.floor(position), HEATMAP_STOPS.length - 2);
+                const mix = position - lower;
+                const rgb = HEATMAP_STOPS[lower].map((channel, k) =>
+                    Math.round(channel + (HEATMAP_STOPS[lower + 1][k] - channel) * mix));
+                colors.push(`rgb(${rgb.join(',')})`);
+            }
+            return colors;
+        }
+        
+        function renderMatrixCanvas(matrix, key) {
+            pendingCanvases.push(matrix);
+            return `
+                <div class="matrix-canvas border border-gray-700 rounded-lg overflow-hidden" data-matrix-key="${key}" data-canvas-index="${pendingCanvases.length - 1}">
+                    <canvas class="block w-full cursor-grab" style="height: ${CANVAS_HEIGHT}px; touch-action: none;"></canvas>
+                    <div class="matrix-canvas-status text-xs text-gray-400 px-2 py-1 bg-gray-900"></div>
+                </div>
+            `;
+        }
+        
+        function mountMatrixCanvases(container) {
+            container.querySelectorAll('.matrix-canvas[data-canvas-index]').forEach(element => {
+                createMatrixCanvas(element, pendingCanvases[element.dataset.canvasIndex]);
+                element.removeAttribute('data-canvas-index');
+            });
+            pendingCanvases.length = 0;
+        }
+        
+        function createMatrixCanvas(element, matrix) {
+            const canvas = element.querySelector('canvas');
+            const status = element.querySelector('.matrix-canvas-status');
+            const context = canvas.getContext('2d');
+            const rows = matrix.length;
+            const cols = matrix[0].length;
+            
+            let low;
+            let high;
+            let range;
+            let summary;
+            
+            function measure() {
+                low = Infinity;
+                high = -Infinity;
+                matrix.forEach(row => row.forEach(value => {
+                    if (value < low) low = value;
+                    if (value > high) high = value;
+                }));
+                range = high - low || 1;
+                summary = `${rows} × ${cols} · min ${low.toFixed(2)} · max ${high.toFixed(2)} · scroll to zoom, drag to pan`;
+                status.textContent = summary;
+            }
+            measure();
+            
+            // view.cell is the on-screen cell size in CSS pixels; x/y the scroll offset
+            const view = { cell: 0, x: 0, y: 0 };
+            let frame = null;
+            let drag = null;
+            
+            function minCellSize() {
+                return Math.min(1, canvas.clientWidth / cols, canvas.clientHeight / rows);
+            }
+            
+            function clampView() {
+                view.cell = Math.max(minCellSize(), Math.min(CANVAS_MAX_CELL_SIZE, view.cell));
+                view.x = Math.max(0, Math.min(view.x, cols * view.cell - canvas.clientWidth));
+                view.y = Math.max(0, Math.min(view.y, rows * view.cell - canvas.clientHeight));
+            }
+            
+            function colorOf(value) {
+                return HEATMAP[Math.round((value - low) / range * (HEATMAP.length - 1))] || '#000000';
+            }
+            
+            function draw() {
+                frame = null;
+                const width = canvas.clientWidth;
+                const height = canvas.clientHeight;
+                const ratio = window.devicePixelRatio || 1;
+                if (canvas.width !== Math.round(width * ratio) || canvas.height !== Math.round(height * ratio)) {
+                    canvas.width = Math.round(width * ratio);
+                    canvas.height = Math.round(height * ratio);
+                }
+                context.setTransform(ratio, 0, 0, ratio, 0, 0);
+                context.fillStyle = '#111827';
+                context.fillRect(0, 0, width, height);
+                
+                // Below one pixel per cell, draw every step-th cell as a step×step block
+                const step = Math.max(1, Math.ceil(1 / view.cell));
+                const size = view.cell * step;
+                const gap = view.cell >= 8 ? 1 : 0;
+                const firstRow = Math.floor(view.y / view.cell / step) * step;
+                const lastRow = Math.min(rows, Math.ceil((view.y + height) / view.cell));
+                const firstCol = Math.floor(view.x / view.cell / step) * step;
+                const lastCol = Math.min(cols, Math.ceil((view.x + width) / view.cell));
+                for (let i = firstRow; i < lastRow; i += step) {
+                    const row = matrix[i];
+                    const top = i * view.cell - view.y;
+                    for (let j = firstCol; j < lastCol; j += step) {
+                        context.fillStyle = colorOf(row[j]);
+                        context.fillRect(j * view.cell - view.x, top, size - gap, size - gap);
+                    }
+                }
+                
+                if (view.cell >= CANVAS_LABEL_MIN_CELL_SIZE) {
+                    context.font = `${Math.min(14, Math.floor(view.cell / 3))}px monospace`;
+                    context.textAlign = 'center';
+                    context.textBaseline = 'middle';
+                    for (let i = firstRow; i < lastRow; i++) {
+                        for (let j = firstCol; j < lastCol; j++) {
+                            const value = matrix[i][j];
+                            context.fillStyle = (value - low) / range > 0.6 ? '#111827' : '#ffffff';
+                            context.fillText(typeof value === 'number' ? value.toFixed(2) : value,
+                                             (j + 0.5) * view.cell - view.x, (i + 0.5) * view.cell - view.y);
+                        }
+                    }
+                }
+            }
+            
+            function scheduleDraw() {
+                if (frame === null) {
+                    frame = requestAnimationFrame(draw);
+                }
+            }
+            
+            function pointerCell(event) {
+                const rect = canvas.getBoundingClientRect();
+                const x = event.clientX - rect.left;
+                const y = event.clientY - rect.top;
+                return { x, y, row: Math.floor((view.y + y) / view.cell), col: Math.floor((view.x + x) / view.cell) };
+            }
+            
+            canvas.addEventListener('wheel', event => {
+                event.preventDefault();
+                const point = pointerCell(event);
+                const previous = view.cell;
+                view.cell = view.cell * Math.exp(-event.deltaY * 0.002);
+                clampView();
+                // Keep the cell under the pointer in place
+                view.x = (view.x + point.x) * view.cell / previous - point.x;
+                view.y = (view.y + point.y) * view.cell / previous - point.y;
+                clampView();
+                scheduleDraw();
+            }, { passive: false });
+            
+            canvas.addEventListener('pointerdown', event => {
+                drag = { x: event.clientX, y: event.clientY };
+                canvas.setPointerCapture(event.pointerId);
+                canvas.classList.replace('cursor-grab', 'cursor-grabbing');
+            });
+            
+            canvas.addEventListener('pointermove', event => {
+                if (drag) {
+                    view.x -= event.clientX - drag.x;
+                    view.y -= event.clientY - drag.y;
+                    drag = { x: event.clientX, y: event.clientY };
+                    clampView();
+                    scheduleDraw();
+                    return;
+                }
+                const point = pointerCell(event);
+                if (point.row >= 0 && point.row < rows && point.col >= 0 && point.col < cols) {
+                    const value = matrix[point.row][point.col];
+                    status.textContent = `[${point.row}, ${point.col}] = ${typeof value === 'number' ? value.toFixed(4) : value}`;
+                }
+            });
+            
+            ['pointerup', 'pointercancel'].forEach(name => canvas.addEventListener(name, () => {
+                drag = null;
+                canvas.classList.replace('cursor-grabbing', 'cursor-grab');
+            }));
+            canvas.addEventListener('pointerleave', () => {
+                status.textContent = summary;
+            });
+            
+            // Called after cells of the shared matrix were patched in place
+            element.refreshMatrix = () => {
+                measure();
+                scheduleDraw();
+            };
+            
+            // Sizes are only known once the canvas is laid out (and again on resize);
+            // the first layout fits the matrix to the canvas width.
+            new ResizeObserver(() => {
+                if (!view.cell && canvas.clientWidth) {
+                    view.cell = canvas.clientWidth / cols;
+                }
+                clampView();
+                scheduleDraw();
+            }).observe(canvas);
+        }
     </script>
 </body>
 </html>
 '''
 
+# Front-end assets. `python build_assets.py` compiles a purged Tailwind stylesheet and
+# copies Font Awesome into static/build/ under content-hashed names, listed in
+# static/assets.json. With that manifest present the page links those files, served
+# with a long-lived immutable Cache-Control; without it the page falls back to the
+# CDN and in-browser Tailwind compilation. The page has no per-request content, so
+# it is rendered once at startup and revalidated against its ETag.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+ASSET_MANIFEST = os.path.join(STATIC_DIR, 'assets.json')
+ASSET_MAX_AGE = int(os.environ.get('ASSET_MAX_AGE', 365 * 24 * 3600))
+
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = ASSET_MAX_AGE
+
+def load_asset_manifest():
+    """URLs of the built stylesheets, or None when build_assets.py has not been run"""
+    try:
+        with open(ASSET_MANIFEST) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    return {name: f'{app.static_url_path}/{path}' for name, path in manifest.items()}
+
+def render_index():
+    """The index page and its ETag"""
+    with app.app_context():
+        html = render_template_string(HTML_TEMPLATE, assets=load_asset_manifest())
+    return html, content_key('index', html)
+
+INDEX_HTML, INDEX_ETAG = render_index()
+
+@app.after_request
+def _cache_built_assets(response):
+    if request.endpoint == 'static' and request.path.startswith(f'{app.static_url_path}/build/'):
+        response.cache_control.immutable = True
+    return response
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    response = Response(INDEX_HTML, mimetype='text/html')
+    response.set_etag(INDEX_ETAG)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def _convolution_record(input_matrix, kernel, bias, stride, padding, algorithm='auto', scale=None,
+                        dilation=1, groups=1):
+    """Convolution operation record; cached on its own so pooling-only changes reuse it
+
+    With a quantization `scale` the input and kernel are int8: the bias is quantized
+    into the int32 accumulator and the result dequantized to float32.
+    """
+    key = content_key('convolution', input_matrix, kernel, bias, stride, padding, algorithm, scale,
+                      dilation, groups)
+    record = result_cache.get(key)
+    if record is not None:
+        return record, True
+    
+    conv_bias = bias
+    if scale is not None and bias is not None:
+        conv_bias = np.asarray(bias, dtype=np.float64) / scale
+    padded_shape = input_matrix.shape[:-2] + (input_matrix.shape[-2] + 2 * padding,
+                                              input_matrix.shape[-1] + 2 * padding)
+    algorithm, factors = plan_convolution(padded_shape, kernel, stride, algorithm, dilation)
+    with timed('convolution'):
+        if (input_matrix.ndim == 2 and kernel.ndim == 2 and bias is None and dilation == 1
+                and algorithm != 'fft' and PARALLEL_WORKERS > 1
+                and _output_size(padded_shape[0], kernel.shape[0], stride)
+                * _output_size(padded_shape[1], kernel.shape[1], stride) >= PARALLEL_MIN_CELLS):
+            conv_result = parallel_convolution(input_matrix, kernel, stride, padding, algorithm)
+        else:
+            conv_result = apply_convolution(input_matrix, kernel, stride, padding, algorithm, conv_bias,
+                                            dilation, groups)
+    if scale is not None:
+        conv_result = dequantize(conv_result, scale)
+    record = {
+        'type': 'convolution',
+        'kernel': kernel,
+        'bias': bias,
+        'stride': stride,
+        'padding': padding,
+        'dilation': dilation,
+        'groups': groups,
+        'algorithm': algorithm,
+        'decomposition': {
+            'type': 'separable' if factors else 'full',
+            'rank': len(factors) if factors else None
+        },
+        'result': conv_result,
+        'result_shape': conv_result.shape
+    }
+    if scale is not None:
+        record['quantization'] = {'dtype': 'int8', 'accumulator': 'int32', 'scale': scale}
+    result_cache.put(key, record, _payload_nbytes(record))
+    return record, False
+
+def _pooling_record(matrix, pool_size, pool_stride, pool_mode, method='auto'):
+    """Pooling operation record"""
+    pool_method = plan_pooling(matrix, pool_size, pool_stride, pool_mode, method)
+    with timed('pooling'):
+        if (matrix.ndim == 2 and method == 'auto' and PARALLEL_WORKERS > 1
+                and _output_size(matrix.shape[0], pool_size, pool_stride)
+                * _output_size(matrix.shape[1], pool_size, pool_stride) >= PARALLEL_MIN_CELLS):
+            pool_result = parallel_pooling(matrix, pool_size, pool_stride, pool_mode)
+        else:
+            pool_result = apply_pooling(matrix, pool_size, pool_stride, pool_mode, pool_method)
+    return {
+        'type': 'pooling',
+        'pool_size': pool_size,
+        'pool_stride': pool_stride,
+        'mode': pool_mode,
+        'method': pool_method,
+        'result': pool_result,
+        'result_shape': pool_result.shape
+    }
+
+# Editing sessions: /process_matrix with "session": true keeps private copies of the
+# padded input and of the convolution and pooling results under a session id (per
+# worker process, LRU-bounded by SESSION_CACHE_BYTES). /process_matrix/delta writes
+# changed cells into it, recomputes only the convolution outputs whose receptive
+# field covers the bounding box of the changes, then the pooling windows over those,
+# and returns just the recomputed regions, with the algorithm the full result used.
+# Sessions need a 2-D float input and kernel, checked before anything is computed;
+# a dilated kernel's receptive field is its whole dilated span.
+SESSION_CACHE_BYTES = int(os.environ.get('SESSION_CACHE_BYTES', 128 * 1024 * 1024))
+session_cache = LRUCache(SESSION_CACHE_BYTES)
+
+def _affected_range(start, stop, window, stride, count):
+    """Outputs [first, last) whose windows overlap the input indices [start, stop)"""
+    first = max(-(-(start - window + 1) // stride), 0)
+    last = min((stop - 1) // stride + 1, count)
+    return first, max(last, first)
+
+def check_session_operands(input_matrix, kernel):
+    """Refuse a session before any work is done for it"""
+    if (input_matrix.ndim != 2 or not np.issubdtype(input_matrix.dtype, np.floating)
+            or (kernel is not None and kernel.ndim != 2)):
+        raise ValueError("Editing sessions need a 2-D float input and a 2-D kernel")
+
+def create_session(input_matrix, kernel, bias, stride, padding, pool, results, dilation=1):
+    """Store a private, editable copy of a /process_matrix computation; returns its id"""
+    check_session_operands(input_matrix, kernel)
+    operations = {op['type']: op for op in results['operations']}
+    convolution, pooling = operations.get('convolution'), operations.get('pooling')
+    if kernel is None:
+        padding = 0
+    session = {
+        'lock': threading.Lock(),
+        'input_shape': input_matrix.shape,
+        'padded': _pad_spatial(input_matrix, padding) if padding > 0 else input_matrix.copy(),
+        'kernel': kernel,
+        'bias': bias,
+        'stride': stride,
+        'padding': padding,
+        'dilation': dilation,
+        # Edits recompute with the algorithm the full result was planned with
+        'algorithm': convolution['algorithm'] if convolution else None,
+        'pool': pool,
+        'convolution': convolution['result'].copy() if convolution else None,
+        'pooling': pooling['result'].copy() if pooling else None,
+    }
+    session_id = uuid.uuid4().hex
+    session_cache.put(session_id, session, _payload_nbytes(session))
+    return session_id
+
+def _session_cells(cells, shape):
+    """Validated (row, col, value) edits; invalid values become 0.0 like grid cells"""
+    edits = []
+    for cell in cells:
+        row, col = int(cell['row']), int(cell['col'])
+        if not (0 <= row < shape[0] and 0 <= col < shape[1]):
+            raise ValueError(f"Cell ({row}, {col}) is outside the {shape[0]} × {shape[1]} input")
+        try:
+            value = float(cell['value'])
+        except (ValueError, TypeError):
+            value = 0.0
+        edits.append((row, col, value))
+    if not edits:
+        raise ValueError("No cells to update")
+    return edits
+
+def apply_session_delta(session, cells):
+    """Apply cell edits and recompute the affected output regions; returns those regions"""
+    edits = _session_cells(cells, session['input_shape'])
+    padding = session['padding']
+    with session['lock']:
+        padded = session['padded']
+        for row, col, value in edits:
+            padded[row + padding, col + padding] = value
+        rows = [row + padding for row, _, _ in edits]
+        cols = [col + padding for _, col, _ in edits]
+        region = (min(rows), max(rows) + 1, min(cols), max(cols) + 1)
+        source = padded
+        update = {}
+        
+        kernel = session['kernel']
+        if kernel is not None:
+            stride, dilation = session['stride'], session['dilation']
+            span_h, span_w = _dilated_size(kernel.shape[0], dilation), _dilated_size(kernel.shape[1], dilation)
+            conv = session['convolution']
+            row_start, row_stop = _affected_range(region[0], region[1], span_h, stride, conv.shape[0])
+            col_start, col_stop = _affected_range(region[2], region[3], span_w, stride, conv.shape[1])
+            if row_stop > row_start and col_stop > col_start:
+                window = padded[row_start * stride:(row_stop - 1) * stride + span_h,
+                                col_start * stride:(col_stop - 1) * stride + span_w]
+                conv[row_start:row_stop, col_start:col_stop] = apply_convolution(
+                    window, kernel, stride, 0, session['algorithm'], session['bias'], dilation)
+            region = (row_start, row_stop, col_start, col_stop)
+            update['convolution'] = {'offset': (row_start, col_start),
+                                     'values': conv[row_start:row_stop, col_start:col_stop].copy()}
+            source = conv
+        
+        pool = session['pool']
+        if pool is not None:
+            size, stride, mode = pool
+            pooled = session['pooling']
+            row_start, row_stop = _affected_range(region[0], region[1], size, stride, pooled.shape[0])
+            col_start, col_stop = _affected_range(region[2], region[3], size, stride, pooled.shape[1])
+            if row_stop > row_start and col_stop > col_start:
+                window = source[row_start * stride:(row_stop - 1) * stride + size,
+                                col_start * stride:(col_stop - 1) * stride + size]
+                pooled[row_start:row_stop, col_start:col_stop] = apply_pooling(window, size, stride, mode)
+            update['pooling'] = {'offset': (row_start, col_start),
+                                 'values': pooled[row_start:row_stop, col_start:col_stop].copy()}
+    return update
+
+def _prepare_operands(input_matrix, kernel, dtype):
+    """Quantize parsed operands for int8 requests; returns (input, kernel, scale or None)"""
+    if dtype != 'int8':
+        return input_matrix, kernel, None
+    input_matrix, scale = quantize(input_matrix)
+    if kernel is not None:
+        kernel = quantize_kernel(kernel)
+    return input_matrix, kernel, scale
 
 @app.route('/process_matrix', methods=['POST'])
 def process_matrix():
     try:
-        data = request.json
+        data = _read_payload()
+        check_input_cells(data['matrix'], data.get('kernel'))
         
-        # Parse input matrices
-        input_matrix = parse_matrix(data['matrix'])
+        dtype = data.get('dtype', 'float64')
         
-        kernel = None
-        if data.get('kernel') and len(data['kernel']) > 0 and len(data['kernel'][0]) > 0:
-            kernel = parse_matrix(data['kernel'])
+        # Parse input matrices
+        with timed('parse'):
+            input_matrix = parse_tensor(data['matrix'], parse_dtype(dtype))
+            
+            kernel = None
+            if _has_cells(data.get('kernel')):
+                kernel = parse_tensor(data['kernel'], parse_dtype(dtype))
+            bias = data.get('bias')
+            bias = None if bias is None else np.asarray(bias, dtype=np.float64)
+            input_matrix, kernel, scale = _prepare_operands(input_matrix, kernel, dtype)
+        if data.get('session'):
+            check_session_operands(input_matrix, kernel)
         
         # Get parameters
         stride = int(data.get('stride', 1))
         padding = int(data.get('padding', 0))
+        dilation = int(data.get('dilation', 1))
+        groups = int(data.get('groups', 1))
         pool_size = int(data.get('pool_size', 0))  # Default to 0 (disabled)
         pool_stride = int(data.get('pool_stride', 2))
         pool_mode = data.get('pool_mode', 'max')
+        algorithm = data.get('algorithm', 'auto')
+        pool_method = data.get('pool_method', 'auto')
         
-        results = {
-            'input_matrix': input_matrix.tolist(),
-            'input_shape': input_matrix.shape,
-            'operations': []
-        }
+        with timed('cache_key'):
+            key = content_key('process_matrix', input_matrix, kernel, bias, stride, padding, algorithm,
+                              pool_size, pool_stride, pool_mode, pool_method, dtype, scale, dilation, groups)
+        # Identical computations share an ETag, so a repeat request is answered with
+        # 304 before any work; session responses carry a fresh id and are never reused
+        etag = None if data.get('session') else result_etag(key, data)
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+        results = result_cache.get(key)
+        cache_status = 'HIT'
+        if results is None:
+            cache_status = 'MISS'
+            pooled_shape = input_matrix.shape
+            cost = 0
+            if kernel is not None:
+                cost += conv_cost(input_matrix.shape, kernel.shape, stride, padding, dilation)
+                pooled_shape = conv_output_shape(input_matrix.shape, kernel.shape, stride, padding, dilation)
+            check_cost(cost + pool_cost(pooled_shape, pool_size, pool_stride))
+            
+            results = {
+                'input_matrix': input_matrix,
+                'input_shape': input_matrix.shape,
+                'dtype': dtype,
+                'operations': []
+            }
+            if scale is not None:
+                results['input_scale'] = scale
+            
+            with compute_slot():
+                # Apply convolution if kernel provided
+                current_matrix = input_matrix if scale is None else dequantize(input_matrix, scale)
+                if kernel is not None:
+                    record, conv_cached = _convolution_record(input_matrix, kernel, bias, stride,
+                                                              padding, algorithm, scale, dilation, groups)
+                    if conv_cached:
+                        cache_status = 'PARTIAL'
+                    results['operations'].append(record)
+                    current_matrix = record['result']
+                
+                # Apply pooling only if enabled
+                if pool_size > 0:
+                    results['operations'].append(
+                        _pooling_record(current_matrix, pool_size, pool_stride, pool_mode, pool_method))
+            
+            result_cache.put(key, results, _payload_nbytes(results))
+        
+        if data.get('session'):
+            pool = (pool_size, pool_stride, pool_mode) if pool_size > 0 else None
+            session_id = create_session(input_matrix, kernel, bias, stride, padding, pool, results,
+                                        dilation)
+            results = dict(results, session_id=session_id)
         
-        # Apply convolution if kernel provided
-        current_matrix = input_matrix
+        response = _respond(results, data)
+        response.headers['X-Cache'] = cache_status
+        if etag is not None:
+            response.set_etag(etag, weak=True)
+        return response
+    
+    except Exception as e:
+        return _error_response(e)
+
+@app.route('/process_matrix/delta', methods=['POST'])
+def process_matrix_delta():
+    try:
+        data = _read_payload()
+        session = session_cache.get(str(data.get('session_id')))
+        if session is None:
+            raise NotFound("Unknown or expired session")
+        cells = data.get('cells') or []
+        check_input_cells(cells)
+        with compute_slot():
+            update = apply_session_delta(session, cells)
+        return _respond(dict(update, session_id=data['session_id']), data)
+    
+    except Exception as e:
+        return _error_response(e)
+
+def _batch_config(config):
+    """Operation parameters of one batch item, with /process_matrix defaults"""
+    return {
+        'stride': int(config.get('stride', 1)),
+        'padding': int(config.get('padding', 0)),
+        'pool_size': int(config.get('pool_size', 0)),
+        'pool_stride': int(config.get('pool_stride', 2)),
+        'pool_mode': config.get('pool_mode', 'max'),
+        'algorithm': config.get('algorithm', 'auto'),
+        'pool_method': config.get('pool_method', 'auto')
+    }
+
+def _batch_item_cost(input_shape, kernel, config):
+    """Cost of one batch item (an upper bound: shared convolutions are counted per item)"""
+    cost = 0
+    if kernel is not None:
+        cost += conv_cost(input_shape, kernel.shape, config['stride'], config['padding'])
+        input_shape = conv_output_shape(input_shape, kernel.shape, config['stride'], config['padding'])
+    return cost + pool_cost(input_shape, config['pool_size'], config['pool_stride'])
+
+def _without_kernel(record):
+    """Operation record minus the kernel/bias, which batch responses send once"""
+    return {key: value for key, value in record.items() if key not in ('kernel', 'bias')}
+
+def _batch_over_configs(matrix, kernel, bias, configs, scale=None):
+    """One input, many configs: pad once, convolve once per (stride, padding, algorithm)"""
+    max_padding = 0
+    if kernel is not None:
+        max_padding = max([config['padding'] for config in configs], default=0)
+    padded = _pad_spatial(matrix, max_padding) if max_padding > 0 else matrix
+    conv_records = {}
+    items = []
+    for config in configs:
+        operations = []
+        current = matrix if scale is None else dequantize(matrix, scale)
         if kernel is not None:
-            conv_result = apply_convolution(input_matrix, kernel, stride, padding)
-            results['operations'].append({
+            group = (config['stride'], config['padding'], config['algorithm'])
+            if group not in conv_records:
+                # Smaller paddings are centred views into the one padded copy
+                offset = max_padding - config['padding']
+                view = padded[..., offset:padded.shape[-2] - offset, offset:padded.shape[-1] - offset]
+                record, _ = _convolution_record(view, kernel, bias, config['stride'], 0,
+                                                config['algorithm'], scale)
+                conv_records[group] = dict(_without_kernel(record), padding=config['padding'])
+            operations.append(conv_records[group])
+            current = conv_records[group]['result']
+        if config['pool_size'] > 0:
+            operations.append(_pooling_record(current, config['pool_size'], config['pool_stride'],
+                                              config['pool_mode'], config['pool_method']))
+        items.append({'config': config, 'operations': operations})
+    return items
+
+def _batch_over_inputs(matrices, kernel, bias, config, scales=None):
+    """Many inputs, one config: same-shape 2-D inputs run as one stacked operation"""
+    # Quantized inputs each have their own scale, so they run one by one; so do
+    # requests for a specific algorithm other than the stacked im2col GEMM
+    stackable = (len({matrix.shape for matrix in matrices}) == 1 and matrices[0].ndim == 2
+                 and (kernel is None or kernel.ndim == 2) and scales is None
+                 and config['algorithm'] in ('auto', 'im2col'))
+    if not stackable:
+        items = []
+        for index, matrix in enumerate(matrices):
+            scale = None if scales is None else scales[index]
+            item = _batch_over_configs(matrix, kernel, bias, [config], scale)[0]
+            item = dict(item, index=index, input_shape=matrix.shape)
+            if scale is not None:
+                item['input_scale'] = scale
+            items.append(item)
+        return items
+    
+    stacked = np.stack(matrices)
+    results = [[] for _ in matrices]
+    current = stacked
+    if kernel is not None:
+        # N×1×H×W against a single 1×1×kh×kw filter: one batched GEMM for every input
+        key = content_key('batch_convolution', stacked, kernel, bias, config['stride'], config['padding'])
+        conv = result_cache.get(key)
+        if conv is None:
+            with timed('convolution'):
+                conv = apply_convolution(stacked[:, None], kernel[None, None], config['stride'],
+                                         config['padding'], 'im2col', bias)[:, 0]
+            result_cache.put(key, conv, conv.nbytes)
+        for index, operations in enumerate(results):
+            operations.append({
                 'type': 'convolution',
-                'kernel': kernel.tolist(),
-                'stride': stride,
-                'padding': padding,
-                'result': conv_result.tolist(),
-                'result_shape': conv_result.shape
+                'stride': config['stride'],
+                'padding': config['padding'],
+                'algorithm': 'im2col',
+                'decomposition': {'type': 'full', 'rank': None},
+                'result': conv[index],
+                'result_shape': conv[index].shape
             })
-            current_matrix = conv_result
+        current = conv
+    if config['pool_size'] > 0:
+        pooled = _pooling_record(current, config['pool_size'], config['pool_stride'],
+                                 config['pool_mode'], config['pool_method'])
+        for index, operations in enumerate(results):
+            operations.append(dict(pooled, result=pooled['result'][index],
+                                   result_shape=pooled['result'][index].shape))
+    return [{'index': index, 'input_shape': matrix.shape, 'config': config, 'operations': operations}
+            for index, (matrix, operations) in enumerate(zip(matrices, results))]
+
+@app.route('/process_batch', methods=['POST'])
+def process_batch():
+    try:
+        data = _read_payload()
+        check_input_cells(data.get('kernel'), data.get('matrix'), *data.get('matrices', []))
+        dtype = data.get('dtype', 'float64')
+        with timed('parse'):
+            kernel = None
+            if _has_cells(data.get('kernel')):
+                kernel = parse_tensor(data['kernel'], parse_dtype(dtype))
+                if dtype == 'int8':
+                    kernel = quantize_kernel(kernel)
+            bias = data.get('bias')
+            bias = None if bias is None else np.asarray(bias, dtype=np.float64)
         
-        # Apply pooling only if enabled
-        if pool_size > 0:
-            pool_result = apply_pooling(current_matrix, pool_size, pool_stride, pool_mode)
-            results['operations'].append({
-                'type': 'pooling',
-                'pool_size': pool_size,
-                'pool_stride': pool_stride,
-                'mode': pool_mode,
-                'result': pool_result.tolist(),
-                'result_shape': pool_result.shape
-            })
+        results = {'kernel': kernel, 'bias': bias, 'dtype': dtype}
+        if 'matrices' in data:
+            with timed('parse'):
+                matrices = [parse_tensor(matrix, parse_dtype(dtype)) for matrix in data['matrices']]
+                scales = None
+                if dtype == 'int8':
+                    quantized = [quantize(matrix) for matrix in matrices]
+                    matrices = [values for values, _ in quantized]
+                    scales = [scale for _, scale in quantized]
+            config = _batch_config(data.get('config') or data)
+            check_cost(sum(_batch_item_cost(matrix.shape, kernel, config) for matrix in matrices))
+            with compute_slot():
+                results['results'] = _batch_over_inputs(matrices, kernel, bias, config, scales)
+        else:
+            with timed('parse'):
+                input_matrix = parse_tensor(data['matrix'], parse_dtype(dtype))
+                scale = None
+                if dtype == 'int8':
+                    input_matrix, scale = quantize(input_matrix)
+                    results['input_scale'] = scale
+            configs = [_batch_config(config) for config in data.get('configs', [])]
+            check_cost(sum(_batch_item_cost(input_matrix.shape, kernel, config) for config in configs))
+            results['input_shape'] = input_matrix.shape
+            with compute_slot():
+                results['results'] = _batch_over_configs(input_matrix, kernel, bias, configs, scale)
+        return _respond(results, data)
+    
+    except Exception as e:
+        return _error_response(e)
+
+@app.route('/trace', methods=['POST'])
+def trace():
+    try:
+        data = _read_payload()
+        check_input_cells(data['matrix'], data['kernel'])
+        with timed('parse'):
+            input_matrix = parse_matrix(data['matrix'])
+            kernel = parse_matrix(data['kernel'])
+        stride = int(data.get('stride', 1))
+        padding = int(data.get('padding', 0))
+        dilation = int(data.get('dilation', 1))
+        if dilation < 1:
+            raise ValueError(f"Dilation must be at least 1, got {dilation}")
+        cursor = max(int(data.get('cursor', 0)), 0)
+        limit = min(int(data.get('limit', TRACE_MAX_FRAMES)), TRACE_MAX_FRAMES)
+        event_stream = (data.get('format') == 'sse'
+                        or request.accept_mimetypes.best == 'text/event-stream')
         
-        return jsonify(results)
+        out_h, out_w = conv_output_shape(input_matrix.shape, kernel.shape, stride, padding, dilation)
+        total = out_h * out_w
+        stop = min(cursor + max(limit, 0), total)
+        check_cost(max(stop - cursor, 0) * kernel.size)
+        frames = iter_convolution_trace(input_matrix, kernel, stride, padding, cursor, stop, dilation)
+    except Exception as e:
+        return _error_response(e)
+    
+    def generate():
+        for chunk in _trace_chunks(frames, cursor, stop, total):
+            payload = json.dumps(_to_builtin(chunk))
+            if event_stream:
+                yield f"event: frames\ndata: {payload}\n\n"
+            else:
+                yield payload + '\n'
+    
+    response = Response(generate(), mimetype='text/event-stream' if event_stream else 'application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache_stats')
+def cache_stats():
+    return jsonify({
+        'results': result_cache.stats(),
+        'kernel_plans': kernel_plan_cache.stats()
+    })
+
+@app.route('/pipeline', methods=['POST'])
+def pipeline():
+    try:
+        data = _read_payload()
+        layers = data.get('layers') or []
+        check_input_cells(data['matrix'], *[layer.get('kernel') for layer in layers])
+        returned = sorted({int(index) for index in data.get('return', [])})
+        dtype = data.get('dtype', 'float64')
+        if dtype == 'int8':
+            raise ValueError("Pipelines support float64 and float32, not int8")
+        with timed('parse'):
+            input_matrix = parse_tensor(data['matrix'], parse_dtype(dtype))
+            stages = compile_pipeline(layers, returned, parse_dtype(dtype))
+        check_cost(pipeline_cost(stages, input_matrix.shape))
+        with compute_slot():
+            output, outputs = run_pipeline(stages, input_matrix, returned)
+        return _respond({
+            'input_shape': input_matrix.shape,
+            'plan': [{'op': stage['op'], 'layers': stage['layers'], 'fused': stage['fused']}
+                     for stage in stages],
+            'stages': [{
+                'index': index,
+                'type': layers[index]['type'],
+                'result': outputs[index],
+                'result_shape': outputs[index].shape
+            } for index in returned if index in outputs],
+            'output': output,
+            'output_shape': output.shape
+        }, data)
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
+        return _error_response(e)
+
+@app.cli.command('process-file')
+@click.argument('input_path')
+@click.argument('output_path')
+@click.option('--kernel', 'kernel_path', help='Kernel as .npy or a JSON grid file')
+@click.option('--stride', default=1, show_default=True)
+@click.option('--padding', default=0, show_default=True)
+@click.option('--pool-size', default=0, show_default=True, help='0 disables pooling')
+@click.option('--pool-stride', default=2, show_default=True)
+@click.option('--pool-mode', default='max', show_default=True, type=click.Choice(POOL_MODES))
+@click.option('--shape', nargs=2, type=int, help='Rows and columns of a raw input file')
+@click.option('--dtype', default='<f8', show_default=True, help='dtype of a raw input file')
+@click.option('--tile-rows', type=int, help='Output rows per tile (default: sized by TILE_BYTES)')
+@click.option('--workers', default=PARALLEL_WORKERS, show_default=True, help='Tiles processed concurrently')
+def process_file_command(input_path, output_path, kernel_path, stride, padding, pool_size,
+                         pool_stride, pool_mode, shape, dtype, tile_rows, workers):
+    """Run tiled convolution/pooling on a memory-mapped raster file"""
+    kernel = None
+    if kernel_path:
+        if kernel_path.endswith('.npy'):
+            kernel = np.load(kernel_path).astype(np.float64)
+        else:
+            with open(kernel_path) as f:
+                kernel = parse_matrix(json.load(f))
+    result_shape = process_file(input_path, output_path, kernel, stride, padding, pool_size,
+                                pool_stride, pool_mode, shape or None, dtype, tile_rows, workers)
+    click.echo(f"Wrote {result_shape[0]} × {result_shape[1]} result to {output_path}")
+
+def warmup():
+    """Exercise every compute path once so a fresh worker's first request runs warm"""
+    matrix = np.arange(64, dtype=np.float64).reshape(8, 8)
+    kernel = np.array([[1.0, 0.0, -1.0], [2.0, 0.0, -2.0], [1.0, 0.0, -1.0]])
+    for algorithm in ('direct', 'im2col', 'fft', 'separable'):
+        apply_convolution(matrix, kernel, 1, 1, algorithm)
+    apply_convolution(matrix[None, None], kernel[None, None], bias=[0.0])
+    for mode in POOL_MODES:
+        for method in POOL_METHODS:
+            apply_pooling(matrix, 4, 1, mode, method)
+    # Starts the BLAS thread pool, which NumPy creates lazily on the first large GEMM
+    np.dot(np.ones((256, 256)), np.ones((256, 256)))
+    with app.test_client() as client:
+        client.get('/')
+        client.post('/process_matrix', json={
+            'matrix': matrix.tolist(), 'kernel': kernel.tolist(), 'pool_size': 2
+        })
+    # Warmup requests are not traffic: start the worker's caches and /metrics empty
+    result_cache.clear()
+    kernel_plan_cache.clear()
+    metrics.reset()
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,185 @@
+# Benchmarks for the convolution/pooling kernels and the /process_matrix endpoint.
+#
+#   python bench.py                          # full sweep, prints cells/sec per case
+#   python bench.py --quick --save base.json # smaller sweep, stored as a JSON baseline
+#   python bench.py --compare base.json      # flags cases slower than the baseline
+#   python bench.py --accuracy               # float32/int8 error against float64
+#
+# Throughput is input cells per second, taken from the best of several timed runs
+# so scheduler noise only ever makes a case look slower. With --compare the exit
+# status is 1 when any case is slower than its baseline by more than --threshold.
+import itertools
+import json
+import platform
+import sys
+import timeit
+
+import click
+import numpy as np
+
+import app as convplayground
+
+CONV_SIZES = (32, 128, 512)
+CONV_KERNELS = (3, 5, 11)
+CONV_STRIDES = (1, 2)
+CONV_PADDINGS = (0, 1)
+POOL_SIZES = (2, 3, 8)
+DTYPE_KERNELS = (3, 5)
+ENDPOINT_SIZES = (32, 128)
+QUICK_SIZES = (32, 128)
+
+def measure(run, cells, repeat):
+    """Best-of-`repeat` throughput of `run` in cells per second"""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return cells / best
+
+def conv_cases(sizes):
+    rng = np.random.default_rng(0)
+    for size, kernel_size, stride, padding in itertools.product(sizes, CONV_KERNELS, CONV_STRIDES,
+                                                                 CONV_PADDINGS):
+        if kernel_size > size + 2 * padding:
+            continue
+        matrix = rng.standard_normal((size, size))
+        kernel = rng.standard_normal((kernel_size, kernel_size))
+        name = f'conv n={size} k={kernel_size} s={stride} p={padding}'
+        yield name, matrix.size, lambda m=matrix, k=kernel, s=stride, p=padding: (
+            convplayground.apply_convolution(m, k, s, p))
+
+def pool_cases(sizes):
+    rng = np.random.default_rng(1)
+    for size, pool_size, mode in itertools.product(sizes, POOL_SIZES, convplayground.POOL_MODES):
+        matrix = rng.standard_normal((size, size))
+        for stride in sorted({pool_size, 1}):
+            name = f'pool n={size} p={pool_size} s={stride} {mode}'
+            yield name, matrix.size, lambda m=matrix, p=pool_size, s=stride, mode=mode: (
+                convplayground.apply_pooling(m, p, s, mode))
+
+def _dtype_operands(matrix, kernel, dtype):
+    """Operands as /process_matrix prepares them for a dtype, plus the int8 input scale"""
+    if dtype == 'int8':
+        values, scale = convplayground.quantize(matrix)
+        return values, convplayground.quantize_kernel(kernel), scale
+    return matrix.astype(dtype), kernel.astype(dtype), None
+
+def _dtype_convolution(matrix, kernel, scale):
+    result = convplayground.apply_convolution(matrix, kernel, 1, 1)
+    return result if scale is None else convplayground.dequantize(result, scale)
+
+def dtype_cases(sizes):
+    """Convolution per compute dtype; int8 uses integer kernels, as the int8 mode requires"""
+    rng = np.random.default_rng(3)
+    for size, kernel_size, dtype in itertools.product(sizes, DTYPE_KERNELS, convplayground.DTYPES):
+        matrix = rng.standard_normal((size, size))
+        kernel = rng.integers(-4, 5, (kernel_size, kernel_size)).astype(np.float64)
+        operands = _dtype_operands(matrix, kernel, dtype)
+        yield (f'conv n={size} k={kernel_size} {dtype}', matrix.size,
+               lambda o=operands: _dtype_convolution(*o))
+
+def accuracy_report(sizes):
+    """Max absolute and relative error of float32/int8 convolution and pooling against float64"""
+    rng = np.random.default_rng(4)
+    click.echo(f"{'case':<36} {'max abs err':>12} {'max rel err':>12}")
+    for size, kernel_size in itertools.product(sizes, DTYPE_KERNELS):
+        matrix = rng.standard_normal((size, size))
+        kernel = rng.integers(-4, 5, (kernel_size, kernel_size)).astype(np.float64)
+        expected = convplayground.apply_convolution(matrix, kernel, 1, 1)
+        expected_pool = convplayground.apply_pooling(expected, 2, 2, 'avg')
+        for dtype in convplayground.DTYPES[1:]:
+            result = _dtype_convolution(*_dtype_operands(matrix, kernel, dtype))
+            pooled = convplayground.apply_pooling(result, 2, 2, 'avg')
+            for name, got, want in (('conv', result, expected), ('conv+avgpool', pooled, expected_pool)):
+                error = float(np.abs(got.astype(np.float64) - want).max())
+                label = f'{name} n={size} k={kernel_size} {dtype}'
+                click.echo(f'{label:<36} {error:>12.3e} {error / float(np.abs(want).max()):>12.3e}')
+
+def endpoint_cases(sizes):
+    """End-to-end /process_matrix calls; the result cache is cleared so every call computes"""
+    client = convplayground.app.test_client()
+    rng = np.random.default_rng(2)
+    for size in sizes:
+        payload = {
+            'matrix': rng.standard_normal((size, size)).round(3).tolist(),
+            'kernel': rng.standard_normal((3, 3)).round(3).tolist(),
+            'padding': 1,
+            'pool_size': 2,
+        }
+
+        def run(payload=payload):
+            convplayground.result_cache.clear()
+            response = client.post('/process_matrix', json=payload)
+            if response.status_code != 200:
+                raise RuntimeError(response.get_json())
+        yield f'process_matrix n={size}', size * size, run
+
+def run_suite(quick, repeat, only):
+    sizes = QUICK_SIZES if quick else CONV_SIZES
+    suites = {
+        'conv': conv_cases(sizes),
+        'pool': pool_cases(sizes),
+        'dtype': dtype_cases(sizes),
+        'endpoint': endpoint_cases(ENDPOINT_SIZES),
+    }
+    results = {}
+    for suite, cases in suites.items():
+        if only and suite not in only:
+            continue
+        for name, cells, run in cases:
+            results[name] = measure(run, cells, repeat)
+            click.echo(f'{name:<36} {results[name]:>16,.0f} cells/s')
+    return results
+
+def compare(results, baseline, threshold):
+    """Names of cases more than `threshold` slower than the baseline"""
+    regressions = []
+    click.echo(f"\nAgainst baseline ({baseline.get('machine', 'unknown machine')}):")
+    for name, throughput in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        change = throughput / previous - 1
+        flag = ''
+        if change < -threshold:
+            flag = '  << SLOWER'
+            regressions.append(name)
+        click.echo(f'{name:<36} {change:>+8.1%}{flag}')
+    return regressions
+
+@click.command()
+@click.option('--quick', is_flag=True, help='Smaller input sizes')
+@click.option('--repeat', default=5, show_default=True, help='Timed runs per case (best is kept)')
+@click.option('--only', multiple=True, type=click.Choice(('conv', 'pool', 'dtype', 'endpoint')),
+              help='Run only these suites')
+@click.option('--save', 'save_path', help='Write results as a JSON baseline')
+@click.option('--compare', 'baseline_path', help='Compare against a JSON baseline')
+@click.option('--threshold', default=0.2, show_default=True,
+              help='Slowdown (fraction of baseline throughput) that counts as a regression')
+@click.option('--accuracy', is_flag=True, help='Only report float32/int8 error against float64')
+def main(quick, repeat, only, save_path, baseline_path, threshold, accuracy):
+    """Benchmark convolution, pooling and /process_matrix across shapes"""
+    if accuracy:
+        accuracy_report(QUICK_SIZES if quick else CONV_SIZES)
+        return
+    results = run_suite(quick, repeat, set(only))
+
+    if save_path:
+        with open(save_path, 'w') as f:
+            json.dump({
+                'machine': f'{platform.node()} {platform.machine()} {platform.python_version()}',
+                'numpy': np.__version__,
+                'results': results,
+            }, f, indent=2)
+        click.echo(f'\nSaved {len(results)} results to {save_path}')
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, threshold)
+        if regressions:
+            click.echo(f'\n{len(regressions)} case(s) slower than baseline by more than {threshold:.0%}')
+            sys.exit(1)
+        click.echo('\nNo regressions')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Builds the self-hosted front-end assets that replace the Tailwind/Font Awesome CDNs.
+#
+#   python build_assets.py                   # writes static/build/ and static/assets.json
+#
+# Needs Node.js and npm: the pinned Tailwind CLI and Font Awesome package are installed
+# into a temporary directory. Tailwind scans app.py with the same config the page uses
+# in CDN mode, so the stylesheet only holds the classes the page actually uses. Output
+# file names carry a content hash, which is what lets app.py serve them as immutable.
+# Restart the server after a build; the page is rendered once at startup.
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+import click
+
+import app as convplayground
+
+TAILWIND_VERSION = '3.4.17'
+FONTAWESOME_VERSION = '6.0.0'
+BUILD_DIR = os.path.join(convplayground.STATIC_DIR, 'build')
+TAILWIND_INPUT = '@tailwind base;\n@tailwind components;\n@tailwind utilities;\n'
+
+def tailwind_config():
+    """The tailwind.config object from the page's CDN fallback, as a CommonJS module"""
+    match = re.search(r'tailwind\.config = (\{.*?\n        \})\n', convplayground.HTML_TEMPLATE, re.S)
+    if match is None:
+        raise click.ClickException('tailwind.config not found in HTML_TEMPLATE')
+    source = os.path.abspath(convplayground.__file__)
+    return f'module.exports = Object.assign({match.group(1)}, {{ content: [{json.dumps(source)}] }});\n'
+
+def fingerprint(path):
+    """Rename `path` to include a hash of its contents; returns the new path"""
+    with open(path, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    stem, ext = os.path.splitext(path)
+    hashed = f'{stem}.{digest}{ext}'
+    os.replace(path, hashed)
+    return hashed
+
+def run(command, cwd):
+    click.echo(f"$ {' '.join(command)}")
+    subprocess.run(command, cwd=cwd, check=True)
+
+@click.command()
+@click.option('--npm', default='npm', show_default=True, help='npm executable')
+def main(npm):
+    """Compile the purged Tailwind stylesheet and vendor Font Awesome into static/"""
+    shutil.rmtree(BUILD_DIR, ignore_errors=True)
+    os.makedirs(BUILD_DIR)
+    with tempfile.TemporaryDirectory() as work:
+        run([npm, 'install', '--no-audit', '--no-fund', f'tailwindcss@{TAILWIND_VERSION}',
+             f'@fortawesome/fontawesome-free@{FONTAWESOME_VERSION}'], work)
+
+        config_path = os.path.join(work, 'tailwind.config.js')
+        input_path = os.path.join(work, 'input.css')
+        with open(config_path, 'w') as f:
+            f.write(tailwind_config())
+        with open(input_path, 'w') as f:
+            f.write(TAILWIND_INPUT)
+        tailwind_path = os.path.join(BUILD_DIR, 'tailwind.css')
+        run([os.path.join(work, 'node_modules', '.bin', 'tailwindcss'), '-c', config_path,
+             '-i', input_path, '-o', tailwind_path, '--minify'], work)
+        tailwind_path = fingerprint(tailwind_path)
+
+        # all.min.css refers to ../webfonts/, so the package layout is kept
+        package = os.path.join(work, 'node_modules', '@fortawesome', 'fontawesome-free')
+        fontawesome_dir = os.path.join(BUILD_DIR, f'fontawesome-{FONTAWESOME_VERSION}')
+        shutil.copytree(os.path.join(package, 'webfonts'), os.path.join(fontawesome_dir, 'webfonts'))
+        os.makedirs(os.path.join(fontawesome_dir, 'css'))
+        fontawesome_path = os.path.join(fontawesome_dir, 'css', 'all.min.css')
+        shutil.copyfile(os.path.join(package, 'css', 'all.min.css'), fontawesome_path)
+        fontawesome_path = fingerprint(fontawesome_path)
+
+    manifest = {
+        'tailwind.css': os.path.relpath(tailwind_path, convplayground.STATIC_DIR),
+        'fontawesome.css': os.path.relpath(fontawesome_path, convplayground.STATIC_DIR),
+    }
+    with open(convplayground.ASSET_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    for name, path in manifest.items():
+        size = os.path.getsize(os.path.join(convplayground.STATIC_DIR, path))
+        click.echo(f'{name:<16} static/{path} ({size:,} bytes)')
+
+if __name__ == '__main__':
+    main()
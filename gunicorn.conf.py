@@ -0,0 +1,31 @@
+# Production serving: gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master (preload_app) so NumPy and the compiled
+# template are shared by the forked workers; each worker then runs app.warmup()
+# before accepting requests. BLAS, the app's own parallel executor and its admission
+# limit (MAX_CONCURRENT_JOBS) get an equal share of the cores per worker, so workers
+# together don't oversubscribe the CPU.
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', max(cpu_count // 2, 1)))
+threads = int(os.environ.get('WORKER_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('WORKER_TIMEOUT', 60))
+preload_app = True
+
+# Must be set before NumPy is imported (which preload_app does right after this file)
+worker_cores = str(max(cpu_count // workers, 1))
+for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                 'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS',
+                 'PARALLEL_WORKERS', 'MAX_CONCURRENT_JOBS'):
+    os.environ.setdefault(variable, worker_cores)
+
+
+def post_worker_init(worker):
+    from app import warmup
+    warmup()
+    worker.log.info("Worker %s warmed up", worker.pid)
@@ -0,0 +1,65 @@
+# Admission control: oversized bodies, inputs and computations are refused with 413
+# before any work, and a full set of compute slots answers 429 with Retry-After.
+import threading
+
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+def test_count_cells_follows_parse_shape():
+    assert app.count_cells([[1, 2, 3], [4, 5, 6]]) == 6
+    assert app.count_cells([[1] * 100] + [[]] * 99) == 100 * 100
+    assert app.count_cells([[[1, 2], [3, 4]], [[5, 6], [7, 8]]]) == 8
+    assert app.count_cells([]) == 0
+    assert app.count_cells([{'row': 0, 'col': 0, 'value': 1}]) == 1
+    assert app.count_cells(np.ones((3, 4))) == 12
+    ragged = [[1] * 100] + [[1]] * 99
+    assert app.count_cells(ragged) == app.parse_matrix(ragged).size
+
+def test_ragged_matrix_over_cell_limit_is_refused(client, monkeypatch):
+    monkeypatch.setattr(app, 'MAX_INPUT_CELLS', 1000)
+    # 101 cells as sent, but parse_matrix would allocate 100 × 100
+    ragged = [[1] * 100] + [[1]] * 99
+    response = client.post('/process_matrix', json={'matrix': ragged})
+    assert response.status_code == 413
+    assert 'limit' in response.get_json()['error']
+
+@pytest.mark.parametrize('path,payload', (
+    ('/process_matrix', {'matrix': [[1] * 40] * 40, 'kernel': [[1]]}),
+    ('/process_batch', {'matrices': [[[1] * 30] * 30] * 2, 'kernel': [[1]]}),
+    ('/trace', {'matrix': [[1] * 40] * 40, 'kernel': [[1]]}),
+    ('/pipeline', {'matrix': [[1] * 40] * 40, 'layers': [{'type': 'conv', 'kernel': [[1]]}]}),
+))
+def test_input_over_cell_limit_is_refused(client, monkeypatch, path, payload):
+    monkeypatch.setattr(app, 'MAX_INPUT_CELLS', 1000)
+    assert client.post(path, json=payload).status_code == 413
+
+def test_cost_over_limit_is_refused(client, monkeypatch):
+    monkeypatch.setattr(app, 'MAX_REQUEST_COST', 1000)
+    payload = {'matrix': [[1] * 20] * 20, 'kernel': [[1] * 5] * 5}
+    assert client.post('/process_matrix', json=payload).status_code == 413
+    payload['kernel'] = [[1]]
+    assert client.post('/process_matrix', json=payload).status_code == 200
+
+def test_body_over_size_limit_is_refused(client, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'MAX_CONTENT_LENGTH', 256)
+    assert client.post('/process_matrix', json={'matrix': [[1] * 100]}).status_code == 413
+
+def test_busy_server_answers_429(client, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(app, 'compute_slots', slots)
+    response = client.post('/process_matrix', json={'matrix': [[1, 2], [3, 4]], 'kernel': [[1]]})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    slots.release()
+    response = client.post('/process_matrix', json={'matrix': [[1, 2], [3, 4]], 'kernel': [[1]]})
+    assert response.status_code == 200
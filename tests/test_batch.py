@@ -0,0 +1,60 @@
+# /process_batch: many inputs under one config (stacked or one by one) and one input
+# under many configs, each item against the same request sent to /process_matrix.
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+def single(client, matrix, kernel, config):
+    body = client.post('/process_matrix', json=dict(config, matrix=matrix, kernel=kernel)).get_json()
+    return [op['result'] for op in body['operations']]
+
+@pytest.mark.parametrize('algorithm', ('auto', 'im2col', 'direct', 'fft'))
+@pytest.mark.parametrize('shapes', (((9, 8),) * 3, ((9, 8), (7, 11))))
+def test_many_inputs_match_single_requests(client, algorithm, shapes):
+    rng = np.random.default_rng(0)
+    matrices = [rng.integers(-9, 10, shape).tolist() for shape in shapes]
+    kernel = rng.integers(-3, 4, (3, 3)).tolist()
+    config = {'stride': 2, 'padding': 1, 'pool_size': 2, 'pool_stride': 1, 'algorithm': algorithm}
+    response = client.post('/process_batch', json={'matrices': matrices, 'kernel': kernel, 'config': config})
+    assert response.status_code == 200
+    items = response.get_json()['results']
+    assert [item['index'] for item in items] == list(range(len(matrices)))
+    for item, matrix in zip(items, matrices):
+        if algorithm != 'auto':
+            assert item['operations'][0]['algorithm'] == algorithm
+        results = [op['result'] for op in item['operations']]
+        for result, expected in zip(results, single(client, matrix, kernel, config)):
+            np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9)
+
+def test_one_input_many_configs(client):
+    rng = np.random.default_rng(1)
+    matrix = rng.standard_normal((12, 10)).tolist()
+    kernel = rng.standard_normal((3, 3)).tolist()
+    configs = [{}, {'padding': 2}, {'stride': 2, 'padding': 1, 'pool_size': 2},
+               {'padding': 2, 'algorithm': 'direct', 'pool_size': 3, 'pool_stride': 1, 'pool_mode': 'avg'}]
+    response = client.post('/process_batch', json={'matrix': matrix, 'kernel': kernel, 'configs': configs})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['kernel'] == kernel
+    for item, config in zip(body['results'], configs):
+        assert 'kernel' not in item['operations'][0]
+        results = [op['result'] for op in item['operations']]
+        for result, expected in zip(results, single(client, matrix, kernel, config)):
+            np.testing.assert_allclose(result, expected, rtol=0, atol=1e-12)
+
+def test_int8_inputs_keep_their_scales(client):
+    matrices = [[[0.1, 0.2], [0.3, 0.4]], [[100, 200], [300, 400]]]
+    body = client.post('/process_batch', json={'matrices': matrices, 'kernel': [[1]],
+                                               'dtype': 'int8'}).get_json()
+    scales = [item['input_scale'] for item in body['results']]
+    assert scales[1] == pytest.approx(1000 * scales[0])
+    for item, matrix in zip(body['results'], matrices):
+        np.testing.assert_allclose(item['operations'][0]['result'], matrix, rtol=0.01)
@@ -0,0 +1,68 @@
+# The binary transport: a JSON header plus aligned raw buffers, in requests and
+# responses, round-tripping every supported dtype including empty arrays.
+import json
+
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+def post_binary(client, payload):
+    return client.post('/process_matrix', data=app.encode_binary_payload(payload),
+                       headers={'Content-Type': app.BINARY_MIMETYPE, 'Accept': app.BINARY_MIMETYPE})
+
+@pytest.mark.parametrize('dtype', sorted(app.BINARY_DTYPES))
+@pytest.mark.parametrize('shape', ((3, 4), (0, 5), (5, 0), (0,), (2, 3, 4)))
+def test_payload_round_trip(dtype, shape):
+    array = np.arange(int(np.prod(shape))).astype(dtype).reshape(shape)
+    decoded = app.decode_binary_payload(app.encode_binary_payload({'a': array, 'nested': [array.T, 1]}))
+    for result in (decoded['a'], decoded['nested'][0].T):
+        assert result.dtype == array.dtype and result.shape == array.shape
+        np.testing.assert_array_equal(result, array)
+    assert decoded['nested'][1] == 1
+
+def test_arrays_are_aligned_views():
+    body = app.encode_binary_payload({'a': np.ones(3, np.int8), 'b': np.ones((2, 2))})
+    header_length = int.from_bytes(body[:4], 'little')
+    header = json.loads(body[4:4 + header_length])
+    assert all(entry['offset'] % 8 == 0 for entry in header['arrays'])
+    assert not app.decode_binary_payload(body)['b'].flags.owndata
+
+@pytest.mark.parametrize('body', (b'', b'\xff\x00\x00\x00{}',
+                                  app.encode_binary_payload({'a': np.ones(4)})[:-8]))
+def test_malformed_payloads_are_rejected(body):
+    with pytest.raises(ValueError):
+        app.decode_binary_payload(body)
+
+def test_process_matrix_binary_matches_json(client):
+    rng = np.random.default_rng(0)
+    matrix, kernel = rng.standard_normal((20, 17)), rng.standard_normal((3, 3))
+    expected = client.post('/process_matrix', json={'matrix': matrix.tolist(), 'kernel': kernel.tolist(),
+                                                    'pool_size': 2}).get_json()
+    response = post_binary(client, {'matrix': matrix, 'kernel': kernel, 'pool_size': 2})
+    assert response.status_code == 200
+    assert response.mimetype == app.BINARY_MIMETYPE
+    result = app.decode_binary_payload(response.data)
+    for operation, reference in zip(result['operations'], expected['operations']):
+        # Binary results carry the exact float64 cells, JSON their shortest repr
+        np.testing.assert_array_equal(operation['result'], reference['result'])
+
+def test_binary_request_with_json_response(client):
+    response = client.post('/process_matrix', data=app.encode_binary_payload({'matrix': np.eye(3),
+                                                                              'kernel': np.ones((2, 2))}),
+                           headers={'Content-Type': app.BINARY_MIMETYPE})
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['operations'][0]['result'] == [[2.0, 1.0], [1.0, 2.0]]
+
+def test_empty_matrix_round_trips(client):
+    response = post_binary(client, {'matrix': np.empty((0, 4)), 'kernel': np.ones((1, 1))})
+    assert response.status_code == 200
+    result = app.decode_binary_payload(response.data)
+    assert result['operations'][0]['result'].shape == (0, 4)
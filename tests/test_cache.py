@@ -0,0 +1,68 @@
+# The content-addressed result cache: LRU eviction by byte size, content keys, and
+# the X-Cache header /process_matrix reports for misses, hits and partial reuse.
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+def test_lru_evicts_least_recently_used_by_size():
+    cache = app.LRUCache(100)
+    cache.put('a', 1, 40)
+    cache.put('b', 2, 40)
+    assert cache.get('a') == 1
+    cache.put('c', 3, 40)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    cache.put('huge', 4, 101)
+    assert cache.get('huge') is None
+    assert cache.stats()['bytes'] == 80
+
+def test_content_key_covers_dtype_shape_and_values():
+    matrix = np.arange(6, dtype=np.float64).reshape(2, 3)
+    key = app.content_key(matrix, 1)
+    assert key == app.content_key(matrix.copy(), 1)
+    assert key != app.content_key(matrix.reshape(3, 2), 1)
+    assert key != app.content_key(matrix.astype(np.float32), 1)
+    assert key != app.content_key(matrix, 2)
+    assert app.content_key(matrix.T) == app.content_key(np.ascontiguousarray(matrix.T))
+    assert app.content_key(np.empty((0, 3))) != app.content_key(np.empty((3, 0)))
+
+def test_x_cache_miss_hit_and_partial(client):
+    payload = {'matrix': np.arange(64).reshape(8, 8).tolist(), 'kernel': [[1, 0], [0, -1]]}
+    first = client.post('/process_matrix', json=payload)
+    assert first.headers['X-Cache'] == 'MISS'
+    second = client.post('/process_matrix', json=payload)
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    # Only the pooling step is new: the convolution record is reused
+    pooled = client.post('/process_matrix', json=dict(payload, pool_size=2))
+    assert pooled.headers['X-Cache'] == 'PARTIAL'
+    assert pooled.get_json()['operations'][0] == first.get_json()['operations'][0]
+
+def test_cached_results_are_not_mutated_by_sessions(client):
+    payload = {'matrix': np.ones((6, 6)).tolist(), 'kernel': [[1, 1], [1, 1]]}
+    expected = client.post('/process_matrix', json=payload).get_json()
+    body = client.post('/process_matrix', json=dict(payload, session=True)).get_json()
+    client.post('/process_matrix/delta', json={'session_id': body['session_id'],
+                                                'cells': [{'row': 0, 'col': 0, 'value': 9}]})
+    assert client.post('/process_matrix', json=payload).get_json() == expected
+
+@pytest.mark.parametrize('payload', ({'matrix': []}, {'matrix': [[]], 'kernel': [[1]]}))
+def test_empty_matrix_is_cached(client, payload):
+    for status in ('MISS', 'HIT'):
+        response = client.post('/process_matrix', json=payload)
+        assert response.status_code == 200
+        assert response.headers['X-Cache'] == status
+
+def test_cache_stats(client):
+    client.post('/process_matrix', json={'matrix': [[1, 2], [3, 4]]})
+    stats = client.get('/cache_stats').get_json()
+    assert stats['results']['entries'] >= 1
+    assert stats['results']['bytes'] <= stats['results']['max_bytes']
@@ -0,0 +1,85 @@
+# gzip response compression (buffered and chunked), Vary, and conditional requests
+# against the ETags of /process_matrix results and the index page.
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+import app
+
+COMPRESS_STAGE = ('convplayground_stage_seconds', (('stage', 'compress'),))
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+def payload(size=40):
+    matrix = np.random.default_rng(0).standard_normal((size, size))
+    return {'matrix': matrix.tolist(), 'kernel': [[1, 0], [0, -1]]}
+
+def compress_count():
+    histogram = app.metrics.histograms.get(COMPRESS_STAGE)
+    return 0 if histogram is None else histogram.count
+
+def test_gzip_round_trip(client):
+    plain = client.post('/process_matrix', json=payload())
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    compressed = client.post('/process_matrix', json=payload(), headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert len(compressed.data) < len(plain.data)
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.post('/process_matrix', json={'matrix': [[1]]}, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+def test_large_bodies_are_compressed_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(app, 'COMPRESS_STREAM_BYTES', 4096)
+    monkeypatch.setattr(app, 'COMPRESS_CHUNK_BYTES', 1024)
+    plain = client.post('/process_matrix', json=payload()).get_json()
+    before = compress_count()
+    response = client.post('/process_matrix', json=payload(), headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    # Compression happens, and is timed, while the body is read
+    assert compress_count() == before
+    assert json.loads(gzip.decompress(response.get_data())) == plain
+    assert compress_count() == before + 1
+
+def test_etag_answers_304_without_recomputing(client, monkeypatch):
+    first = client.post('/process_matrix', json=payload())
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+    def fail(*args, **kwargs):
+        raise AssertionError('recomputed a cached result')
+    monkeypatch.setattr(app, '_convolution_record', fail)
+    again = client.post('/process_matrix', json=payload(), headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    compressed = client.post('/process_matrix', json=payload(),
+                             headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert compressed.status_code == 304
+
+def test_etag_depends_on_encoding_options(client):
+    first = client.post('/process_matrix', json=payload())
+    rounded = client.post('/process_matrix', json=dict(payload(), precision=3),
+                          headers={'If-None-Match': first.headers['ETag']})
+    assert rounded.status_code == 200
+    assert rounded.headers['ETag'] != first.headers['ETag']
+
+def test_sessions_have_no_etag(client):
+    response = client.post('/process_matrix', json=dict(payload(), session=True))
+    assert 'ETag' not in response.headers
+
+def test_index_is_conditional_and_compressed(client):
+    first = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert b'<html' in gzip.decompress(first.data)
+    again = client.get('/', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
@@ -0,0 +1,45 @@
+# The direct and FFT backends against the reference loop, and automatic selection.
+import itertools
+
+import numpy as np
+import pytest
+
+import app
+
+SHAPES = ((9, 9), (16, 11), (37, 24))
+KERNEL_SIZES = (1, 2, 3, 5)
+STRIDES = (1, 2, 3)
+PADDINGS = (0, 2)
+
+def operands(shape, size, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(shape), rng.standard_normal((size, size))
+
+@pytest.mark.parametrize('algorithm', ('direct', 'fft'))
+@pytest.mark.parametrize('shape,size,stride,padding', list(itertools.product(SHAPES, KERNEL_SIZES, STRIDES,
+                                                                              PADDINGS)))
+def test_backend_matches_reference(algorithm, shape, size, stride, padding):
+    matrix, kernel = operands(shape, size)
+    expected = app.apply_convolution_reference(matrix, kernel, stride, padding)
+    result = app.apply_convolution(matrix, kernel, stride, padding, algorithm)
+    assert result.shape == expected.shape
+    if algorithm == 'direct':
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+    else:
+        bound = app.FFT_TOLERANCE * np.abs(matrix).max() * np.abs(kernel).sum()
+        np.testing.assert_allclose(result, expected, rtol=0, atol=bound)
+
+def test_fft_handles_kernel_larger_than_input():
+    matrix, kernel = operands((4, 4), 5)
+    assert app.apply_convolution(matrix, kernel, 1, 0, 'fft').shape == (0, 0)
+    np.testing.assert_allclose(app.apply_convolution(matrix, kernel, 1, 1, 'fft'),
+                               app.apply_convolution_reference(matrix, kernel, 1, 1), atol=1e-12)
+
+def test_auto_selection():
+    assert app.select_conv_algorithm((64, 64), (3, 3)) == 'direct'
+    assert app.select_conv_algorithm((64, 64), (5, 5)) == 'im2col'
+    assert app.select_conv_algorithm((512, 512), (31, 31)) == 'fft'
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        app.apply_convolution(np.ones((4, 4)), np.ones((2, 2)), algorithm='winograd')
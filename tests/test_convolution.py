@@ -0,0 +1,38 @@
+# The vectorized convolution engine (strided windows and im2col) against the
+# per-cell reference loop for every stride and padding.
+import itertools
+
+import numpy as np
+import pytest
+
+import app
+
+SHAPES = ((9, 9), (16, 11), (37, 24), (1, 7))
+KERNEL_SIZES = (1, 2, 3, 5)
+STRIDES = (1, 2, 3)
+PADDINGS = (0, 1, 2)
+
+def conv_cases():
+    for shape, size, stride, padding in itertools.product(SHAPES, KERNEL_SIZES, STRIDES, PADDINGS):
+        if size <= min(shape) + 2 * padding:
+            yield shape, size, stride, padding
+
+@pytest.mark.parametrize('algorithm', ('auto', 'im2col'))
+@pytest.mark.parametrize('shape,size,stride,padding', list(conv_cases()))
+def test_convolution_matches_reference(algorithm, shape, size, stride, padding):
+    rng = np.random.default_rng(0)
+    matrix, kernel = rng.standard_normal(shape), rng.standard_normal((size, size))
+    expected = app.apply_convolution_reference(matrix, kernel, stride, padding)
+    result = app.apply_convolution(matrix, kernel, stride, padding, algorithm)
+    assert result.shape == expected.shape == app.conv_output_shape(shape, kernel.shape, stride, padding)
+    bound = app.FFT_TOLERANCE * np.abs(matrix).max() * np.abs(kernel).sum()
+    np.testing.assert_allclose(result, expected, rtol=0, atol=bound)
+
+def test_rectangular_kernel_matches_reference():
+    rng = np.random.default_rng(1)
+    matrix, kernel = rng.standard_normal((14, 10)), rng.standard_normal((2, 4))
+    np.testing.assert_allclose(app.apply_convolution(matrix, kernel, 2, 1),
+                               app.apply_convolution_reference(matrix, kernel, 2, 1), rtol=1e-12, atol=1e-12)
+
+def test_kernel_larger_than_input_gives_empty_result():
+    assert app.apply_convolution(np.ones((3, 3)), np.ones((4, 4))).shape == (0, 0)
@@ -0,0 +1,127 @@
+# Dilated convolution on every backend, grouped/depthwise convolution against
+# per-group reference loops, and both parameters on /process_matrix.
+import itertools
+
+import numpy as np
+import pytest
+
+import app
+
+SHAPES = ((9, 9), (16, 11), (37, 24))
+KERNEL_SIZES = (1, 2, 3, 5)
+STRIDES = (1, 2, 3)
+PADDINGS = (0, 2)
+DILATIONS = (2, 3)
+
+def dilated_cases():
+    for shape, size, stride, padding, dilation in itertools.product(SHAPES, KERNEL_SIZES, STRIDES, PADDINGS,
+                                                                    DILATIONS):
+        if app._dilated_size(size, dilation) <= min(shape) + 2 * padding:
+            yield shape, size, stride, padding, dilation
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+@pytest.mark.parametrize('algorithm', ('auto', 'direct', 'im2col'))
+@pytest.mark.parametrize('shape,size,stride,padding,dilation', list(dilated_cases()))
+def test_dilated_convolution_matches_reference(algorithm, shape, size, stride, padding, dilation):
+    rng = np.random.default_rng(0)
+    matrix, kernel = rng.standard_normal(shape), rng.standard_normal((size, size))
+    expected = app.apply_convolution_reference(matrix, kernel, stride, padding, dilation)
+    result = app.apply_convolution(matrix, kernel, stride, padding, algorithm, dilation=dilation)
+    assert result.shape == expected.shape == app.conv_output_shape(shape, kernel.shape, stride, padding,
+                                                                   dilation)
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize('shape,size,stride,padding,dilation', list(dilated_cases()))
+def test_dilated_separable_matches_reference(shape, size, stride, padding, dilation):
+    rng = np.random.default_rng(1)
+    matrix = rng.standard_normal(shape)
+    kernel = np.outer(rng.integers(1, 4, size), rng.integers(-3, 4, size)).astype(np.float64)
+    if app.kernel_decomposition(kernel) is None:
+        pytest.skip('kernel is not low rank')
+    expected = app.apply_convolution_reference(matrix, kernel, stride, padding, dilation)
+    result = app.apply_convolution(matrix, kernel, stride, padding, 'separable', dilation=dilation)
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+def test_fft_rejects_dilation_and_auto_avoids_it():
+    matrix, kernel = np.ones((64, 64)), np.ones((15, 15))
+    with pytest.raises(ValueError):
+        app.apply_convolution(matrix, kernel, algorithm='fft', dilation=2)
+    assert app.plan_convolution(matrix.shape, kernel, 1, 'auto', 2)[0] != 'fft'
+
+def test_dilation_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        app.apply_convolution(np.ones((5, 5)), np.ones((2, 2)), dilation=0)
+
+@pytest.mark.parametrize('algorithm', ('direct', 'im2col'))
+def test_integer_dilated_convolution_is_exact(algorithm):
+    rng = np.random.default_rng(2)
+    matrix = rng.integers(-100, 100, (20, 17)).astype(np.int8)
+    kernel = rng.integers(-5, 6, (3, 3)).astype(np.int8)
+    expected = app.apply_convolution_reference(matrix.astype(np.float64), kernel, 2, 1, 2)
+    result = app.apply_convolution(matrix, kernel, 2, 1, algorithm, dilation=2)
+    assert result.dtype == np.int32
+    np.testing.assert_array_equal(result, expected)
+
+def grouped_reference(inputs, weights, stride, padding, dilation, groups):
+    """Per-filter sum of single-channel reference convolutions over the filter's group"""
+    per_group = weights.shape[0] // groups
+    channels = weights.shape[1]
+    outputs = []
+    for index, filters in enumerate(weights):
+        start = index // per_group * channels
+        outputs.append(sum(app.apply_convolution_reference(inputs[start + c], filters[c], stride, padding,
+                                                           dilation)
+                           for c in range(channels)))
+    return np.stack(outputs)
+
+@pytest.mark.parametrize('groups,in_channels,out_channels', ((1, 3, 2), (2, 4, 6), (4, 4, 4), (4, 4, 8)))
+@pytest.mark.parametrize('stride,padding,dilation', ((1, 0, 1), (2, 1, 1), (1, 2, 2), (2, 0, 3)))
+def test_grouped_convolution_matches_reference(groups, in_channels, out_channels, stride, padding, dilation):
+    rng = np.random.default_rng(3)
+    inputs = rng.standard_normal((in_channels, 13, 12))
+    weights = rng.standard_normal((out_channels, in_channels // groups, 3, 3))
+    bias = rng.standard_normal(out_channels)
+    expected = grouped_reference(inputs, weights, stride, padding, dilation, groups) + bias[:, None, None]
+    result = app.apply_convolution(inputs, weights, stride, padding, bias=bias, dilation=dilation,
+                                   groups=groups)
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+    batch = app.apply_convolution(np.stack([inputs, inputs[::-1]]), weights, stride, padding, bias=bias,
+                                  dilation=dilation, groups=groups)
+    np.testing.assert_allclose(batch[0], expected, rtol=1e-12, atol=1e-12)
+
+def test_grouped_convolution_rejects_mismatched_channels():
+    with pytest.raises(ValueError):
+        app.apply_convolution(np.ones((4, 5, 5)), np.ones((6, 2, 2, 2)), groups=3)
+    with pytest.raises(ValueError):
+        app.apply_convolution(np.ones((5, 5)), np.ones((2, 2)), groups=2)
+
+def test_process_matrix_accepts_dilation(client):
+    rng = np.random.default_rng(4)
+    matrix, kernel = rng.integers(-9, 10, (12, 11)), rng.integers(-3, 4, (3, 3))
+    response = client.post('/process_matrix', json={'matrix': matrix.tolist(), 'kernel': kernel.tolist(),
+                                                    'padding': 1, 'dilation': 2})
+    assert response.status_code == 200
+    record = response.get_json()['operations'][0]
+    assert record['dilation'] == 2
+    expected = app.apply_convolution_reference(matrix.astype(np.float64), kernel, 1, 1, 2)
+    np.testing.assert_array_equal(record['result'], expected)
+
+def test_process_matrix_depthwise_groups(client):
+    rng = np.random.default_rng(5)
+    inputs, weights = rng.integers(-9, 10, (3, 8, 8)), rng.integers(-3, 4, (3, 1, 3, 3))
+    response = client.post('/process_matrix', json={'matrix': inputs.tolist(), 'kernel': weights.tolist(),
+                                                    'groups': 3})
+    assert response.status_code == 200
+    record = response.get_json()['operations'][0]
+    assert record['groups'] == 3
+    expected = grouped_reference(inputs.astype(np.float64), weights, 1, 0, 1, 3)
+    np.testing.assert_array_equal(record['result'], expected)
+    response = client.post('/process_matrix', json={'matrix': inputs.tolist(), 'kernel': weights.tolist(),
+                                                    'groups': 2})
+    assert response.status_code == 400
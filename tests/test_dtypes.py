@@ -0,0 +1,98 @@
+# Accuracy of the float32 and int8 compute dtypes against float64, with the error
+# bounds each mode promises.
+import numpy as np
+import pytest
+
+import app
+
+FLOAT32_EPS = float(np.finfo(np.float32).eps)
+SIZES = (16, 64)
+KERNEL_SIZES = (3, 5)
+
+def operands(size, kernel_size, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((size, size)) * 10
+    kernel = rng.integers(-4, 5, (kernel_size, kernel_size)).astype(np.float64)
+    return matrix, kernel
+
+def int8_bound(matrix, kernel, scale):
+    """Rounding each input to the nearest step moves an output by at most scale/2 · Σ|k|"""
+    result_scale = np.abs(matrix).max() * np.abs(kernel).sum()
+    return scale / 2 * np.abs(kernel).sum() + 4 * FLOAT32_EPS * result_scale
+
+@pytest.mark.parametrize('algorithm', ('auto', 'direct', 'im2col', 'fft', 'separable'))
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('kernel_size', KERNEL_SIZES)
+def test_float32_convolution_error(algorithm, size, kernel_size):
+    matrix, kernel = operands(size, kernel_size)
+    if algorithm == 'separable':
+        kernel = np.outer(np.arange(1, kernel_size + 1), np.ones(kernel_size))
+    expected = app.apply_convolution(matrix, kernel, 1, 1)
+    result = app.apply_convolution(matrix.astype(np.float32), kernel.astype(np.float32), 1, 1, algorithm)
+    assert result.dtype == np.float32
+    # Each output sums taps products; every float32 step adds at most one eps of the running magnitude
+    bound = kernel.size * FLOAT32_EPS * np.abs(matrix).max() * np.abs(kernel).sum()
+    assert np.abs(result - expected).max() <= bound
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('kernel_size', KERNEL_SIZES)
+def test_int8_convolution_error(size, kernel_size):
+    matrix, kernel = operands(size, kernel_size)
+    values, scale = app.quantize(matrix)
+    assert scale == pytest.approx(np.abs(matrix).max() / app.QUANTIZED_MAX)
+    assert np.abs(app.dequantize(values, scale) - matrix).max() <= scale / 2 * (1 + 1e-6)
+    result = app.dequantize(app.apply_convolution(values, app.quantize_kernel(kernel), 1, 1), scale)
+    expected = app.apply_convolution(matrix, kernel, 1, 1)
+    assert result.dtype == np.float32
+    assert np.abs(result - expected).max() <= int8_bound(matrix, kernel, scale)
+
+def test_int8_is_exact_for_small_integer_inputs():
+    rng = np.random.default_rng(1)
+    matrix = rng.integers(-127, 128, (20, 20)).astype(np.float64)
+    kernel = rng.integers(-4, 5, (3, 3)).astype(np.float64)
+    values, scale = app.quantize(matrix)
+    assert scale == 1.0
+    result = app.dequantize(app.apply_convolution(values, app.quantize_kernel(kernel)), scale)
+    np.testing.assert_array_equal(result, app.apply_convolution(matrix, kernel))
+
+def test_int8_rejects_non_integer_kernels():
+    with pytest.raises(ValueError):
+        app.quantize_kernel(np.array([[0.5, 1.0]]))
+    with pytest.raises(ValueError):
+        app.quantize_kernel(np.array([[200.0]]))
+
+@pytest.mark.parametrize('mode', app.POOL_MODES)
+@pytest.mark.parametrize('method', app.POOL_METHODS)
+def test_float32_pooling_error(mode, method):
+    matrix = np.random.default_rng(2).standard_normal((33, 31))
+    expected = app.apply_pooling(matrix, 4, 1, mode)
+    result = app.apply_pooling(matrix.astype(np.float32), 4, 1, mode, method)
+    assert result.dtype == np.float32
+    if mode == 'avg':
+        np.testing.assert_allclose(result, expected, rtol=0, atol=16 * FLOAT32_EPS * np.abs(matrix).max())
+    else:
+        # max/min only select cells, so they are exact on the float32 input
+        np.testing.assert_array_equal(result, expected.astype(np.float32))
+
+@pytest.mark.parametrize('dtype', ('float32', 'int8'))
+def test_process_matrix_dtype_error(dtype):
+    matrix, kernel = operands(40, 3, seed=3)
+    bias = 0.37
+    expected = app.apply_convolution(matrix, kernel, 1, 1, bias=bias)
+    expected_pool = app.apply_pooling(expected, 2, 2, 'avg')
+    response = app.app.test_client().post('/process_matrix', json={
+        'matrix': matrix.tolist(), 'kernel': kernel.tolist(), 'bias': bias, 'padding': 1,
+        'pool_size': 2, 'pool_stride': 2, 'pool_mode': 'avg', 'dtype': dtype,
+    }, headers={'Accept': app.BINARY_MIMETYPE})
+    assert response.status_code == 200
+    payload = app.decode_binary_payload(response.get_data())
+    conv, pool = (op['result'] for op in payload['operations'])
+    assert conv.dtype == pool.dtype == np.float32
+    if dtype == 'float32':
+        bound = kernel.size * FLOAT32_EPS * np.abs(matrix).max() * np.abs(kernel).sum()
+    else:
+        # The bias is rounded into the int32 accumulator too: another half step
+        scale = payload['input_scale']
+        bound = int8_bound(matrix, kernel, scale) + scale / 2
+    assert np.abs(conv - expected).max() <= bound
+    assert np.abs(pool - expected_pool).max() <= bound
@@ -0,0 +1,69 @@
+# JSON responses: arrays formatted straight from NumPy must match json.dumps
+# of their lists, `precision` rounds cells and scalars, and `echo_inputs` drops inputs.
+import json
+
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+@pytest.mark.parametrize('array', (
+    np.arange(12, dtype=np.int32).reshape(3, 4),
+    np.random.default_rng(0).standard_normal((3, 5)),
+    np.random.default_rng(1).standard_normal((2, 3, 4)).astype(np.float32),
+    np.empty((0, 3)),
+    np.array(2.5),
+    np.array([[np.nan, 1.5], [np.inf, -np.inf]]),
+))
+def test_default_encoding_matches_json_dumps(array):
+    assert json.loads(app.encode_json_payload({'a': array}).replace('NaN', '"NaN"')) == json.loads(
+        json.dumps({'a': array.tolist()}).replace('NaN', '"NaN"'))
+
+@pytest.mark.parametrize('precision', (0, 2, 5))
+def test_precision_rounds_cells(precision):
+    array = np.random.default_rng(2).standard_normal((4, 6)) * 100
+    decoded = json.loads(app.encode_json_payload(array, precision))
+    np.testing.assert_array_equal(decoded, np.round(array, precision))
+
+def test_whole_cells_are_written_as_integers():
+    assert app.encode_json_payload(np.array([[1.0, -2.0], [3.0, 4.0]]), 3) == '[[1,-2],[3,4]]'
+    assert app.encode_json_payload(np.array([[1.0, 2.5]]), 3) == '[[1.000,2.500]]'
+
+def test_non_finite_cells_keep_precision_of_finite_cells():
+    array = np.array([[np.nan, 1.2345], [np.inf, -np.inf]])
+    assert app.encode_json_payload(array, 2) == '[[NaN,1.23],[Infinity,-Infinity]]'
+    assert app.encode_json_payload(np.array([np.nan, 2.0]), 2) == '[NaN,2]'
+
+def test_precision_rounds_scalars():
+    payload = {'scale': 0.0123456, 'numpy': np.float32(1.98765), 'count': np.int64(3), 'flag': np.bool_(True),
+               'name': 'x', 'whole': 2.0}
+    assert json.loads(app.encode_json_payload(payload, 3)) == {'scale': 0.012, 'numpy': 1.988, 'count': 3,
+                                                              'flag': True, 'name': 'x', 'whole': 2}
+    assert json.loads(app.encode_json_payload(payload)) == dict(payload, numpy=float(np.float32(1.98765)),
+                                                                count=3, flag=True)
+
+def test_process_matrix_precision(client):
+    matrix = np.random.default_rng(3).standard_normal((6, 6))
+    body = client.post('/process_matrix', json={'matrix': matrix.tolist(), 'kernel': [[2, -1]],
+                                                'precision': 2, 'dtype': 'int8'}).get_json()
+    result = np.asarray(body['operations'][0]['result'])
+    np.testing.assert_array_equal(result, np.round(result, 2))
+    assert body['input_scale'] == round(body['input_scale'], 2)
+
+def test_echo_inputs_false_drops_inputs(client):
+    payload = {'matrix': [[1, 2], [3, 4]], 'kernel': [[1]], 'bias': 0.5}
+    full = client.post('/process_matrix', json=payload).get_json()
+    assert 'input_matrix' in full and 'kernel' in full['operations'][0]
+    lean = client.post('/process_matrix', json=dict(payload, echo_inputs=False)).get_json()
+    assert 'input_matrix' not in lean
+    assert not {'kernel', 'bias'} & set(lean['operations'][0])
+    assert lean['operations'][0]['result'] == full['operations'][0]['result']
+    # The cached payload still echoes its inputs
+    assert client.post('/process_matrix', json=payload).get_json() == full
@@ -0,0 +1,68 @@
+# Banded multi-core convolution and pooling against whole-matrix execution. Bands never
+# depend on the worker count, so results must be bit-identical, not merely close.
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import app
+
+PARALLEL_SHAPE = (300, 257)
+
+def operands(shape, size, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(shape), rng.standard_normal((size, size))
+
+@pytest.mark.parametrize('dtype', (np.float64, np.float32))
+@pytest.mark.parametrize('algorithm', ('auto', 'direct', 'im2col', 'fft', 'separable'))
+@pytest.mark.parametrize('size,stride,padding', ((3, 1, 1), (5, 2, 0), (19, 1, 4)))
+def test_parallel_convolution_is_bit_identical(dtype, algorithm, size, stride, padding):
+    rng = np.random.default_rng(5)
+    matrix = rng.standard_normal(PARALLEL_SHAPE).astype(dtype)
+    # Integer factors keep the kernel exactly rank 1 in float32 as well
+    kernel = np.outer(rng.integers(1, 5, size), rng.integers(-4, 5, size)).astype(dtype)
+    expected = app.apply_convolution(matrix, kernel, stride, padding, algorithm)
+    result = app.parallel_convolution(matrix, kernel, stride, padding, algorithm, workers=4)
+    assert result.dtype == expected.dtype
+    np.testing.assert_array_equal(result, expected)
+
+def test_parallel_process_backend_is_bit_identical():
+    matrix, kernel = operands(PARALLEL_SHAPE, 5, seed=6)
+    expected = app.apply_convolution(matrix, kernel, 1, 2, 'im2col')
+    result = app.parallel_convolution(matrix, kernel, 1, 2, 'im2col', workers=2, backend='process')
+    np.testing.assert_array_equal(result, expected)
+
+@pytest.mark.parametrize('band_rows', (16, 32, 48))
+def test_aligned_band_rows_keep_im2col_bit_identical(monkeypatch, band_rows):
+    monkeypatch.setattr(app, 'PARALLEL_BAND_ROWS', band_rows)
+    for seed in range(5):
+        matrix, kernel = operands(PARALLEL_SHAPE, 3 + 2 * seed, seed=20 + seed)
+        expected = app.apply_convolution(matrix, kernel, 1, seed % 3, 'im2col')
+        result = app.parallel_convolution(matrix, kernel, 1, seed % 3, 'im2col', workers=3)
+        np.testing.assert_array_equal(result, expected)
+
+@pytest.mark.parametrize('value,expected', (('1', 16), ('10', 16), ('16', 16), ('33', 48), ('0', 16)))
+def test_band_rows_round_up_to_alignment(value, expected):
+    env = dict(os.environ, PARALLEL_BAND_ROWS=value)
+    output = subprocess.run([sys.executable, '-c', 'import app; print(app.PARALLEL_BAND_ROWS)'], env=env,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            capture_output=True, text=True, check=True).stdout
+    assert int(output) == expected
+
+@pytest.mark.parametrize('mode', app.POOL_MODES)
+@pytest.mark.parametrize('size,stride', ((2, 2), (3, 1), (8, 8)))
+def test_parallel_pooling_is_bit_identical(mode, size, stride):
+    matrix = np.random.default_rng(7).standard_normal(PARALLEL_SHAPE)
+    expected = app.apply_pooling(matrix, size, stride, mode)
+    np.testing.assert_array_equal(app.parallel_pooling(matrix, size, stride, mode, workers=4), expected)
+
+def test_process_matrix_parallel_path_matches_serial(monkeypatch):
+    monkeypatch.setattr(app, 'PARALLEL_MIN_CELLS', 1)
+    matrix, kernel = operands((120, 120), 19, seed=8)
+    for workers in (1, 4):
+        monkeypatch.setattr(app, 'PARALLEL_WORKERS', workers)
+        app.result_cache.clear()
+        record, _ = app._convolution_record(matrix, kernel, None, 1, 0)
+        np.testing.assert_array_equal(record['result'], app.apply_convolution(matrix, kernel))
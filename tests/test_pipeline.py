@@ -0,0 +1,100 @@
+# /pipeline: layer fusion in the compiled plan, and fused execution against the
+# same layers applied one at a time.
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    with app.app.test_client() as client:
+        yield client
+
+def unfused(matrix, layers):
+    """Apply each layer on its own, with no fusion"""
+    current = np.asarray(matrix, dtype=np.float64)
+    for layer in layers:
+        kind = layer['type']
+        if kind == 'conv':
+            current = app.apply_convolution(current, np.asarray(layer['kernel'], dtype=np.float64),
+                                            layer.get('stride', 1), layer.get('padding', 0))
+        elif kind == 'pool':
+            size = layer.get('size', 2)
+            current = app.apply_pooling(current, size, layer.get('stride', size), layer.get('mode', 'max'))
+        elif kind == 'pad':
+            current = np.pad(current, layer.get('padding', 1), constant_values=layer.get('value', 0))
+        elif kind == 'bias':
+            current = current + layer['value']
+        elif layer.get('function', 'relu') == 'relu':
+            current = np.maximum(current, 0)
+        elif layer['function'] == 'tanh':
+            current = np.tanh(current)
+        elif layer['function'] == 'sigmoid':
+            current = 1 / (1 + np.exp(-current))
+        else:
+            current = np.where(current < 0, current * layer.get('alpha', 0.01), current)
+    return current
+
+LAYERS = [
+    {'type': 'pad', 'padding': 1},
+    {'type': 'conv', 'kernel': [[1, -1, 0], [2, 0, -2], [0, 1, 1]], 'padding': 1},
+    {'type': 'bias', 'value': 0.5},
+    {'type': 'relu'},
+    {'type': 'pool', 'size': 2},
+    {'type': 'activation', 'function': 'tanh'},
+    {'type': 'pad', 'padding': 2, 'value': 1},
+    {'type': 'conv', 'kernel': [[1, 2], [3, 4]], 'stride': 2},
+    {'type': 'activation', 'function': 'leaky_relu', 'alpha': 0.1},
+    {'type': 'activation', 'function': 'sigmoid'},
+]
+
+def test_plan_fuses_padding_and_elementwise_layers():
+    plan = [(stage['op'], stage['layers'], stage['fused']) for stage in app.compile_pipeline(LAYERS)]
+    assert plan == [
+        ('conv', [0, 1, 2, 3], ['pad', 'bias', 'relu']),
+        ('pool', [4, 5], ['tanh']),
+        ('pad', [6], []),
+        ('conv', [7, 8, 9], ['leaky_relu', 'sigmoid']),
+    ]
+    stages = app.compile_pipeline(LAYERS)
+    assert stages[0]['layer']['padding'] == 2
+
+def test_returned_layers_stay_fusion_boundaries():
+    stages = app.compile_pipeline(LAYERS, returned=[0, 2])
+    assert [stage['layers'] for stage in stages][:3] == [[0], [1, 2], [3]]
+    assert stages[2]['op'] == 'elementwise'
+
+@pytest.mark.parametrize('returned', ([], [1, 4, 7]))
+def test_pipeline_matches_unfused_layers(client, returned):
+    matrix = np.random.default_rng(0).standard_normal((17, 15))
+    response = client.post('/pipeline', json={'matrix': matrix.tolist(), 'layers': LAYERS,
+                                              'return': returned})
+    assert response.status_code == 200
+    body = response.get_json()
+    expected = unfused(matrix, LAYERS)
+    assert tuple(body['output_shape']) == expected.shape
+    np.testing.assert_allclose(body['output'], expected, rtol=1e-12, atol=1e-12)
+    assert [stage['index'] for stage in body['stages']] == returned
+    for stage in body['stages']:
+        np.testing.assert_allclose(stage['result'], unfused(matrix, LAYERS[:stage['index'] + 1]),
+                                   rtol=1e-12, atol=1e-12)
+
+def test_pipeline_does_not_mutate_the_input():
+    matrix = np.random.default_rng(1).standard_normal((6, 6))
+    original = matrix.copy()
+    app.run_pipeline(app.compile_pipeline([{'type': 'relu'}, {'type': 'bias', 'value': 1}]), matrix)
+    np.testing.assert_array_equal(matrix, original)
+
+@pytest.mark.parametrize('layers', (
+    [{'type': 'softmax'}],
+    [{'type': 'conv'}],
+    [{'type': 'activation', 'function': 'gelu'}],
+    [{'type': 'pool', 'size': 0}],
+))
+def test_invalid_layers_are_rejected(client, layers):
+    assert client.post('/pipeline', json={'matrix': [[1, 2], [3, 4]], 'layers': layers}).status_code == 400
+
+def test_int8_is_rejected(client):
+    response = client.post('/pipeline', json={'matrix': [[1]], 'layers': [{'type': 'relu'}], 'dtype': 'int8'})
+    assert response.status_code == 400
@@ -0,0 +1,31 @@
+# Every pooling mode and method against the reference loop. Pooling only selects or
+# sums cells, so results must match exactly; 'sat' falls back to windows whenever
+# its prefix sums would round.
+import numpy as np
+import pytest
+
+import app
+
+POOL_CASES = [(size, stride) for size in (1, 2, 3, 4, 5, 8) for stride in sorted({1, 2, size})]
+
+@pytest.mark.parametrize('integer_cells', (True, False))
+@pytest.mark.parametrize('method', app.POOL_METHODS)
+@pytest.mark.parametrize('mode', app.POOL_MODES)
+@pytest.mark.parametrize('size,stride', POOL_CASES)
+def test_pooling_matches_reference(integer_cells, method, mode, size, stride):
+    rng = np.random.default_rng(4)
+    matrix = rng.standard_normal((29, 23))
+    if integer_cells:
+        matrix = np.rint(matrix * 50)
+    expected = app.apply_pooling_reference(matrix, size, stride, mode)
+    result = app.apply_pooling(matrix, size, stride, mode, method)
+    np.testing.assert_array_equal(result, expected)
+
+def test_sat_only_runs_on_exact_sums():
+    integer = np.rint(np.random.default_rng(5).standard_normal((10, 10)) * 10)
+    assert app.plan_pooling(integer, 4, 1, 'avg', 'sat') == 'sat'
+    assert app.plan_pooling(integer + 0.1, 4, 1, 'avg', 'sat') == 'window'
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        app.apply_pooling(np.ones((4, 4)), 2, 2, 'median')
@@ -0,0 +1,39 @@
+# Low-rank kernel detection and the separable 1-D pass path.
+import itertools
+
+import numpy as np
+import pytest
+
+import app
+
+SHAPES = ((9, 9), (16, 11), (37, 24))
+KERNEL_SIZES = (2, 3, 5)
+
+@pytest.mark.parametrize('shape,size,stride,padding', list(itertools.product(SHAPES, KERNEL_SIZES, (1, 2, 3),
+                                                                              (0, 2))))
+def test_separable_matches_reference(shape, size, stride, padding):
+    rng = np.random.default_rng(1)
+    matrix = rng.standard_normal(shape)
+    kernel = np.outer(rng.integers(1, 4, size), rng.integers(-3, 4, size)).astype(np.float64)
+    expected = app.apply_convolution_reference(matrix, kernel, stride, padding)
+    result = app.apply_convolution(matrix, kernel, stride, padding, 'separable')
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+def test_rank_two_kernel_matches_reference():
+    rng = np.random.default_rng(2)
+    matrix = rng.standard_normal((20, 20))
+    kernel = np.outer(rng.standard_normal(5), rng.standard_normal(5)) + np.outer(rng.standard_normal(5),
+                                                                                rng.standard_normal(5))
+    assert len(app.kernel_decomposition(kernel)) == 2
+    np.testing.assert_allclose(app.apply_convolution(matrix, kernel, 1, 1, 'separable'),
+                               app.apply_convolution_reference(matrix, kernel, 1, 1), rtol=1e-10, atol=1e-10)
+
+def test_decomposition():
+    sobel = np.array([[1.0, 0, -1], [2, 0, -2], [1, 0, -1]])
+    (column, row), = app.kernel_decomposition(sobel)
+    np.testing.assert_array_equal(np.outer(column, row), sobel)
+    assert app.kernel_decomposition(np.random.default_rng(3).standard_normal((5, 5))) is None
+    assert app.kernel_decomposition(np.zeros((3, 3))) is None
+    kernel = np.eye(3) + np.rot90(np.eye(3)) * 2 + 0.5
+    with pytest.raises(ValueError):
+        app.apply_convolution(np.ones((5, 5)), kernel, algorithm='separable')
@@ -0,0 +1,29 @@
+# Production serving: gunicorn's per-worker share of the cores and warmup leaving
+# a worker with empty caches and metrics.
+import multiprocessing
+import os
+import runpy
+
+import app
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+def test_config_splits_cores_between_workers(monkeypatch):
+    environ = {key: value for key, value in os.environ.items()
+               if key not in ('PARALLEL_WORKERS', 'MAX_CONCURRENT_JOBS', 'OMP_NUM_THREADS')}
+    environ.update(WEB_CONCURRENCY='4', OPENBLAS_NUM_THREADS='1')
+    monkeypatch.setattr(os, 'environ', environ)
+    monkeypatch.setattr(multiprocessing, 'cpu_count', lambda: 16)
+    config = runpy.run_path(CONFIG)
+    assert config['workers'] == 4
+    for variable in ('PARALLEL_WORKERS', 'MAX_CONCURRENT_JOBS', 'OMP_NUM_THREADS'):
+        assert environ[variable] == '4'
+    # Explicit settings win
+    assert environ['OPENBLAS_NUM_THREADS'] == '1'
+
+def test_warmup_leaves_caches_and_metrics_empty():
+    app.warmup()
+    assert all(line.startswith('#') for line in app.metrics.render().splitlines())
+    for cache in (app.result_cache, app.kernel_plan_cache):
+        stats = cache.stats()
+        assert stats['entries'] == stats['hits'] == stats['misses'] == 0
@@ -0,0 +1,79 @@
+# Editing sessions: a series of /process_matrix/delta edits must leave the session's
+# results equal to a full recompute of the edited input.
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    app.result_cache.clear()
+    with app.app.test_client() as client:
+        yield client
+
+def apply_update(results, update):
+    for name, part in update.items():
+        if name in results:
+            row, col = part['offset']
+            values = np.asarray(part['values'])
+            results[name][row:row + values.shape[0], col:col + values.shape[1]] = values
+
+@pytest.mark.parametrize('algorithm', ('auto', 'direct', 'im2col', 'fft'))
+@pytest.mark.parametrize('size,stride,padding,dilation,pool', (
+    (3, 1, 1, 1, None),
+    (3, 2, 0, 1, (2, 2, 'max')),
+    (5, 1, 2, 1, (3, 1, 'avg')),
+    (3, 1, 2, 2, (2, 2, 'max')),
+))
+def test_delta_matches_full_recompute(client, algorithm, size, stride, padding, dilation, pool):
+    if algorithm == 'fft' and dilation > 1:
+        pytest.skip('fft does not support dilation')
+    rng = np.random.default_rng(0)
+    matrix = np.rint(rng.standard_normal((17, 14)) * 20)
+    kernel = rng.integers(-3, 4, (size, size))
+    payload = {'matrix': matrix.tolist(), 'kernel': kernel.tolist(), 'stride': stride, 'padding': padding,
+               'dilation': dilation, 'algorithm': algorithm, 'session': True}
+    if pool:
+        payload.update(pool_size=pool[0], pool_stride=pool[1], pool_mode=pool[2])
+    body = client.post('/process_matrix', json=payload).get_json()
+    results = {op['type']: np.asarray(op['result']) for op in body['operations']}
+    if algorithm != 'auto':
+        assert body['operations'][0]['algorithm'] == algorithm
+    
+    for step in range(4):
+        cells = [{'row': int(rng.integers(17)), 'col': int(rng.integers(14)),
+                  'value': int(rng.integers(-50, 50))} for _ in range(step + 1)]
+        for cell in cells:
+            matrix[cell['row'], cell['col']] = cell['value']
+        response = client.post('/process_matrix/delta', json={'session_id': body['session_id'],
+                                                              'cells': cells})
+        assert response.status_code == 200
+        apply_update(results, response.get_json())
+    
+    expected = app.apply_convolution(matrix, kernel.astype(np.float64), stride, padding, dilation=dilation)
+    np.testing.assert_allclose(results['convolution'], expected, rtol=0, atol=1e-9)
+    if pool:
+        np.testing.assert_allclose(results['pooling'], app.apply_pooling(expected, *pool), rtol=0, atol=1e-9)
+
+def test_session_recomputes_with_the_planned_algorithm(client):
+    matrix, kernel = np.ones((12, 12)), np.ones((3, 3))
+    body = client.post('/process_matrix', json={'matrix': matrix.tolist(), 'kernel': kernel.tolist(),
+                                                'algorithm': 'im2col', 'session': True}).get_json()
+    assert app.session_cache.get(body['session_id'])['algorithm'] == 'im2col'
+
+@pytest.mark.parametrize('payload', (
+    {'matrix': [[1, 2], [3, 4]], 'kernel': [[1]], 'dtype': 'int8'},
+    {'matrix': [[[1, 2], [3, 4]], [[5, 6], [7, 8]]], 'kernel': [[[[1]], [[1]]]]},
+))
+def test_ineligible_session_is_refused_before_computing(client, monkeypatch, payload):
+    def fail(*args, **kwargs):
+        raise AssertionError('computed before refusing')
+    monkeypatch.setattr(app, '_convolution_record', fail)
+    response = client.post('/process_matrix', json=dict(payload, session=True))
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Editing sessions')
+
+def test_unknown_session_is_404(client):
+    response = client.post('/process_matrix/delta', json={'session_id': 'missing', 'cells': []})
+    assert response.status_code == 404
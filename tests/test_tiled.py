@@ -0,0 +1,47 @@
+# Tiled convolution and pooling over memory-mapped rasters against whole-matrix results.
+import numpy as np
+import pytest
+
+import app
+
+def operands(shape, size, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(shape), rng.standard_normal((size, size))
+
+@pytest.mark.parametrize('algorithm', ('direct', 'im2col'))
+@pytest.mark.parametrize('stride,padding', ((1, 0), (2, 3)))
+def test_tiled_convolution_matches_serial(algorithm, stride, padding):
+    matrix, kernel = operands((70, 45), 3, seed=9)
+    expected = app.apply_convolution(matrix, kernel, stride, padding, algorithm)
+    out = np.empty_like(expected)
+    app.convolve_tiled(matrix, kernel, out, stride, padding, algorithm, tile_rows=7)
+    if algorithm == 'direct':
+        np.testing.assert_array_equal(out, expected)
+    else:
+        # 7-row tiles split BLAS row blocks differently from the whole matrix
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize('mode', app.POOL_MODES)
+def test_tiled_pooling_matches_serial(mode):
+    matrix = np.random.default_rng(10).standard_normal((70, 45))
+    expected = app.apply_pooling(matrix, 3, 2, mode)
+    out = np.empty_like(expected)
+    app.pool_tiled(matrix, out, 3, 2, mode, tile_rows=5)
+    np.testing.assert_array_equal(out, expected)
+
+def test_tiled_convolution_checks_output_shape():
+    matrix, kernel = operands((10, 10), 3)
+    with pytest.raises(ValueError):
+        app.convolve_tiled(matrix, kernel, np.empty((9, 9)))
+
+@pytest.mark.parametrize('pool_size', (0, 2))
+def test_process_file(tmp_path, pool_size):
+    matrix, kernel = operands((90, 61), 3, seed=11)
+    np.save(tmp_path / 'input.npy', matrix)
+    output = tmp_path / 'output.npy'
+    shape = app.process_file(tmp_path / 'input.npy', str(output), kernel, 1, 1, pool_size, 2, 'max',
+                             tile_rows=8, workers=2)
+    expected = app.apply_pooling(app.apply_convolution(matrix, kernel, 1, 1, 'direct'), pool_size, 2, 'max')
+    assert shape == expected.shape
+    np.testing.assert_array_equal(np.load(output), expected)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['input.npy', 'output.npy']
@@ -0,0 +1,82 @@
+# /trace: frames streamed as NDJSON or server-sent events, chunked, and resumable
+# from the cursor each chunk carries; every frame agrees with the convolution.
+import json
+
+import numpy as np
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    app.app.config['TESTING'] = True
+    with app.app.test_client() as client:
+        yield client
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def read_events(response):
+    chunks = []
+    for event in response.get_data(as_text=True).split('\n\n'):
+        if event:
+            name, data = event.split('\n')
+            assert name == 'event: frames'
+            chunks.append(json.loads(data[len('data: '):]))
+    return chunks
+
+@pytest.mark.parametrize('stride,padding,dilation', ((1, 0, 1), (2, 1, 1), (1, 1, 2)))
+def test_frames_match_convolution(client, stride, padding, dilation):
+    rng = np.random.default_rng(0)
+    matrix, kernel = rng.integers(-9, 10, (9, 8)), rng.integers(-3, 4, (3, 3))
+    expected = app.apply_convolution(matrix.astype(np.float64), kernel, stride, padding, dilation=dilation)
+    response = client.post('/trace', json={'matrix': matrix.tolist(), 'kernel': kernel.tolist(),
+                                           'stride': stride, 'padding': padding, 'dilation': dilation})
+    assert response.mimetype == 'application/x-ndjson'
+    chunks = read_ndjson(response)
+    frames = [frame for chunk in chunks for frame in chunk['frames']]
+    assert len(frames) == expected.size == chunks[-1]['total']
+    assert chunks[-1]['done']
+    assert all(len(chunk['frames']) <= app.TRACE_CHUNK_FRAMES for chunk in chunks)
+    for frame in frames:
+        row, col = frame['position']
+        assert frame['value'] == expected[row, col]
+        assert frame['partial_sums'][-1] == frame['value']
+        assert np.sum(frame['products']) == frame['value']
+
+def test_cursor_paging_resumes_where_the_last_page_stopped(client):
+    matrix, kernel = np.arange(100).reshape(10, 10).tolist(), [[1, 2], [3, 4]]
+    total = 81
+    cursor, indices = 0, []
+    while True:
+        chunks = read_ndjson(client.post('/trace', json={'matrix': matrix, 'kernel': kernel,
+                                                         'cursor': cursor, 'limit': 20}))
+        indices += [frame['index'] for chunk in chunks for frame in chunk['frames']]
+        cursor = chunks[-1]['cursor']
+        if chunks[-1]['done']:
+            break
+    assert indices == list(range(total))
+
+def test_cursor_past_the_end_returns_an_empty_done_chunk(client):
+    chunks = read_ndjson(client.post('/trace', json={'matrix': [[1, 2], [3, 4]], 'kernel': [[1]],
+                                                     'cursor': 10}))
+    assert chunks == [{'frames': [], 'cursor': 10, 'total': 4, 'done': True}]
+
+def test_limit_is_capped(client, monkeypatch):
+    monkeypatch.setattr(app, 'TRACE_MAX_FRAMES', 5)
+    chunks = read_ndjson(client.post('/trace', json={'matrix': np.ones((6, 6)).tolist(), 'kernel': [[1]],
+                                                     'limit': 100}))
+    assert chunks[-1]['cursor'] == 5 and not chunks[-1]['done']
+
+@pytest.mark.parametrize('request_kwargs', (
+    {'json': {'matrix': np.ones((9, 9)).tolist(), 'kernel': [[1]], 'format': 'sse'}},
+    {'json': {'matrix': np.ones((9, 9)).tolist(), 'kernel': [[1]]},
+     'headers': {'Accept': 'text/event-stream'}},
+))
+def test_server_sent_events(client, request_kwargs):
+    response = client.post('/trace', **request_kwargs)
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    chunks = read_events(response)
+    assert [len(chunk['frames']) for chunk in chunks] == [32, 32, 17]
+    assert chunks[-1]['done']